@@ -1,5 +1,4 @@
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 import os
 
@@ -12,20 +11,76 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SECURE'] = False
 app.config['PERMANENT_SESSION_LIFETIME'] = 1800
+PRODUCTION = os.environ.get('FLASK_ENV') == 'production'
+app.config['SESSION_STORE'] = os.environ.get('SESSION_STORE') or ('sqlite' if PRODUCTION else 'cookie')
+app.config['SQLITE_PRODUCTION'] = PRODUCTION
+app.config['SQLALCHEMY_REPLICA_URI'] = os.environ.get('DATABASE_REPLICA_URL')
 
-# Initialize extensions FIRST
-db = SQLAlchemy(app)
+# Initialize extensions FIRST; models owns the db instance the routes use
+from models import db
+from db_routing import configure_replica
+from sqlite_profile import sqlite_profile
+sqlite_profile.configure(app)
+configure_replica(app)
+db.init_app(app)
+sqlite_profile.init_app(app, db)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.login_message = '// ACCESS DENIED: Authentication required //'
 login_manager.login_message_category = 'error'
 
+# Server-side sessions; the cookie only carries the session id
+from session_store import session_store
+session_store.init_app(app)
+
+# Password hashing in a bounded worker pool, under the configured policy
+from hash_pool import hash_pool
+from password_hashing import hashing_policy
+hash_pool.init_app(app)
+hashing_policy.init_app(app)
+
+# Failed-login limits per username and client address
+from rate_limit import login_limiter
+login_limiter.init_app(app)
+
+# Audit rows are queued and written in batches off the request path
+from audit_writer import audit_writer
+audit_writer.init_app(app)
+
+# Compiled templates cached on disk, static layout fragments in memory
+from template_cache import template_cache
+template_cache.init_app(app)
+
+# Bundled, fingerprinted stylesheets and scripts served with immutable caching
+from assets import assets
+assets.init_app(app)
+
+# Precompressed static files and gzip/brotli for large HTML responses
+from compression import compression
+compression.init_app(app)
+
+# Rendered-page cache and ETag/304 handling for views that opt in
+from response_cache import response_cache
+response_cache.init_app(app)
+
 # Now import models AFTER db is created
 from models import User
 
+# current_user comes from a per-process snapshot cache, not a query per request
+from user_cache import user_cache
+user_cache.init_app(app, db, User)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.load(user_id)
+
+# Login times are written in batches instead of one commit per login
+from last_login import last_login_buffer
+last_login_buffer.init_app(app, db, User)
+
+# Admin and dashboard counts kept in memory, updated as users are committed
+from user_stats import user_stats
+user_stats.init_app(app, db, User)
 
 # Import routes
 from routes import init_routes
@@ -38,23 +93,21 @@ if __name__ == '__main__':
         
         # Create default users if they don't exist
         if not User.query.filter_by(username='vault_admin').first():
-            from werkzeug.security import generate_password_hash
             admin = User(
                 username='vault_admin',
                 email='admin@vault-tec.com',
-                role='admin',
-                password_hash=generate_password_hash('Vault-Tec2077!')
+                role='admin'
             )
+            admin.set_password('Vault-Tec2077!')
             db.session.add(admin)
         
         if not User.query.filter_by(username='wastelander').first():
-            from werkzeug.security import generate_password_hash
             user = User(
                 username='wastelander',
                 email='wastelander@ncr.com',
-                role='user',
-                password_hash=generate_password_hash('NCR!2024')
+                role='user'
             )
+            user.set_password('NCR!2024')
             db.session.add(user)
         
         db.session.commit()
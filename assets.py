@@ -0,0 +1,185 @@
+"""Bundle, minify and fingerprint the Pip-Boy stylesheets and scripts.
+
+    python assets.py build [--static-folder static]
+
+writes static/dist/pipboy.<hash>.css and pipboy.<hash>.js, then the .gz/.br
+siblings of every static file (see compression.py). The hash is taken
+from the bundle's contents, so a changed file gets a new URL and the old
+one can be cached forever. Apps bound to the asset pipeline build any
+missing bundle at startup, so the command is only needed where the
+static folder is read-only at runtime.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sys
+
+from flask import request, url_for
+
+from compression import precompress
+
+try:
+    import rcssmin
+except ImportError:  # Falls back to the built-in whitespace/comment stripper
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:  # Falls back to the built-in line-based stripper
+    rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+# Bundle name -> source files under the static folder, in cascade/load order
+BUNDLES = {
+    'pipboy.css': ('layout.css', 'pipboy.css', 'main.css', 'pipboy-ui.css'),
+    'pipboy.js': ('pipboy-effects.js', 'pipboy-sounds.js', 'password-meter.js', 'layout.js')
+}
+
+DIST_DIR = 'dist'
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_CSS_TOKENS = re.compile(
+    r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/|\s*([{};,>])\s*|(:)\s+|\s+''', re.S
+)
+
+
+def minify_css(text):
+    """Drop comments and redundant whitespace, leaving strings untouched"""
+    if rcssmin is not None:
+        return rcssmin.cssmin(text)
+
+    def token(match):
+        string, punctuation, colon = match.groups()
+        if string or punctuation or colon:
+            return string or punctuation or colon
+        return '' if match.group(0).startswith('/*') else ' '
+
+    return _CSS_TOKENS.sub(token, text).replace(';}', '}').strip()
+
+
+def minify_js(text):
+    """Strip indentation, blank lines and whole-line comments.
+
+    Line breaks are kept so automatic semicolon insertion behaves as in
+    the source. Without rjsmin, a script containing a backtick is left
+    as it is: telling a template literal apart from a backtick in a
+    comment, string or regex takes a real tokenizer.
+    """
+    if rjsmin is not None:
+        return rjsmin.jsmin(text)
+    if '`' in text:
+        return text
+
+    lines = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped and not stripped.startswith('//'):
+            lines.append(stripped)
+    return '\n'.join(lines)
+
+
+_MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def bundle_contents(static_folder, name, minify=True):
+    """The concatenated (and minified) sources of one bundle"""
+    ext = os.path.splitext(name)[1]
+    chunks = []
+    for source in BUNDLES[name]:
+        with open(os.path.join(static_folder, source), encoding='utf-8') as f:
+            text = f.read()
+        chunks.append(_MINIFIERS[ext](text) if minify else text)
+    # A semicolon between scripts keeps one file's last statement from
+    # running into the next file's first
+    return (';\n' if ext == '.js' else '\n').join(chunks) + '\n'
+
+
+def build(static_folder, minify=True):
+    """Write every bundle under static/dist; returns bundle name -> file name"""
+    output_dir = os.path.join(static_folder, DIST_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {}
+    for name in BUNDLES:
+        data = bundle_contents(static_folder, name, minify).encode('utf-8')
+        stem, ext = os.path.splitext(name)
+        filename = f'{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}'
+        path = os.path.join(output_dir, filename)
+        if not os.path.exists(path):
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)  # Concurrent workers write identical bytes
+        manifest[name] = filename
+    return manifest
+
+
+class AssetPipeline:
+    """Serves the bundles under content-hashed URLs.
+
+    Templates call asset_urls('pipboy.css') and get the fingerprinted
+    bundle, or the individual source files when ASSETS_BUNDLE is off (or
+    the bundle can't be written). Responses for static/dist/ are marked
+    public and immutable for a year.
+    """
+
+    def __init__(self):
+        self.manifest = {}
+
+    def init_app(self, app):
+        self.manifest = {}
+        if app.config.get('ASSETS_BUNDLE', True):
+            try:
+                self.manifest = build(app.static_folder, app.config.get('ASSETS_MINIFY', True))
+            except OSError as e:
+                logger.warning('Serving unbundled assets, build failed: %s', e)
+
+        app.add_template_global(self.asset_urls)
+        app.after_request(self._cache_headers)
+        app.extensions['assets'] = self
+
+    def asset_urls(self, name):
+        """URLs to include for a bundle, in order"""
+        filename = self.manifest.get(name)
+        if filename is not None:
+            return [url_for('static', filename=f'{DIST_DIR}/{filename}')]
+        return [url_for('static', filename=source) for source in BUNDLES[name]]
+
+    @staticmethod
+    def _cache_headers(response):
+        if (request.endpoint == 'static' and response.status_code in (200, 304)
+                and (request.view_args or {}).get('filename', '').startswith(f'{DIST_DIR}/')):
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
+
+
+# Shared instance, bound to an app with assets.init_app(app)
+assets = AssetPipeline()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the fingerprinted Pip-Boy asset bundles')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='bundle and minify into static/dist')
+    build_parser.add_argument('--static-folder', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'))
+    build_parser.add_argument('--no-minify', action='store_true', help='concatenate only')
+    build_parser.add_argument('--no-compress', action='store_true', help='skip the .gz/.br siblings')
+    args = parser.parse_args(argv)
+
+    manifest = build(args.static_folder, minify=not args.no_minify)
+    for name, filename in manifest.items():
+        size = os.path.getsize(os.path.join(args.static_folder, DIST_DIR, filename))
+        print(f'{name:12} -> {DIST_DIR}/{filename} ({size} bytes)')
+    if not args.no_compress:
+        print(f'{precompress(args.static_folder)} compressed siblings written')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
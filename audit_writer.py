@@ -0,0 +1,158 @@
+import atexit
+import queue
+import threading
+import time
+
+from models import db
+
+
+class AuditWriter:
+    """Queue audit rows (LoginAttempt, SecurityLog) and insert them in batches.
+
+    Request threads only put a dict on a bounded queue. A background
+    thread writes a batch of up to `batch_size` rows per table once the
+    batch is full or `flush_interval` seconds have passed, in one
+    transaction with an executemany INSERT. If the queue is full, rows
+    are dropped and counted rather than blocking the login path. The
+    queue is drained at interpreter exit.
+
+    Until init_app() is called, rows are written synchronously.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.batch_size = 200
+        self.flush_interval = 1.0
+        self.max_queue = 10000
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', self.flush_interval)
+        self.max_queue = app.config.get('AUDIT_MAX_QUEUE', self.max_queue)
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        app.extensions['audit_writer'] = self
+        atexit.register(self.shutdown)
+
+    def enqueue(self, model, **values):
+        """Queue one row; returns False if it had to be dropped"""
+        if self._queue is None:
+            return self._write_now(model, values)
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((model, values))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _write_now(self, model, values):
+        try:
+            db.session.add(model(**values))
+            db.session.commit()
+            self.written += 1
+            return True
+        except Exception:
+            db.session.rollback()
+            self.failed += 1
+            raise
+
+    def _ensure_started(self):
+        # Started on first use so it runs in the worker, not a pre-fork master
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._stopping.clear()
+                    self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+        # Drain whatever was queued before shutdown
+        while True:
+            batch = self._collect(block=False)
+            if not batch:
+                break
+            self._write(batch)
+
+    def _collect(self, block=True):
+        """Gather up to batch_size rows, waiting at most flush_interval"""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if block and timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        rows_by_table = {}
+        for model, values in batch:
+            rows_by_table.setdefault(model.__table__, []).append(values)
+
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as connection:
+                    for table, rows in rows_by_table.items():
+                        connection.execute(table.insert(), rows)
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+        except Exception as e:
+            with self._lock:
+                self.failed += len(batch)
+            self.app.logger.error(f"Failed to write {len(batch)} audit records: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far has been written"""
+        deadline = time.monotonic() + timeout
+        while self._queue is not None and self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def shutdown(self, timeout=5.0):
+        """Stop the writer thread after writing all queued rows"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        """Queue depth and write counters"""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+                'max_queue': self.max_queue,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'batches': self.batches
+            }
+
+
+# Shared instance, bound to an app with audit_writer.init_app(app)
+audit_writer = AuditWriter()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+SQLite profile benchmark for the Vault-Tec Secure System
+
+Runs the database side of login and registration from several threads
+against a fresh database file, once with default engine settings and
+once with the production profile (WAL, pragmas, pooled writer and
+readers). Password hashing is left out so the numbers measure the
+database only.
+
+    python bench_sqlite.py
+    python bench_sqlite.py --threads 16 --seconds 10 --users 20000
+"""
+
+import argparse
+import itertools
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+
+from models import LoginAttempt, User, db
+from sqlite_profile import SQLiteProfile
+
+
+def build_app(path, production):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    app.config['SQLITE_PRODUCTION'] = production
+    profile = SQLiteProfile()
+    profile.configure(app)
+    db.init_app(app)
+    profile.init_app(app, db)
+    return app
+
+
+def seed(app, users):
+    with app.app_context():
+        db.create_all(bind_key=None)  # the read bind shares the default database
+        db.session.execute(User.__table__.insert(), [
+            dict(username=f'dweller{i}', email=f'dweller{i}@vault.com', password_hash='x', role='user')
+            for i in range(users)
+        ])
+        db.session.commit()
+
+
+def login(users, counter):
+    """Look the user up, reload it as the user_loader would, log the attempt"""
+    username = f'dweller{random.randrange(users)}'
+    user = User.query.filter_by(username=username).first()
+    for _ in range(3):
+        db.session.get(User, user.id)
+        db.session.expire_all()
+    db.session.add(LoginAttempt(username=username, ip_address='10.0.0.1', success=True,
+                                attempt_time=datetime.utcnow()))
+    db.session.commit()
+
+
+def register(users, counter):
+    """Check the name is free, then insert the user"""
+    n = next(counter)
+    username = f'recruit{n}'
+    if User.query.filter((User.username == username) | (User.email == f'{username}@vault.com')).first():
+        return
+    db.session.add(User(username=username, email=f'{username}@vault.com', password_hash='x', role='user'))
+    db.session.commit()
+
+
+def mixed(users, counter):
+    (register if random.random() < 0.1 else login)(users, counter)
+
+
+WORKLOADS = {'login': login, 'register': register, 'mixed': mixed}
+
+
+def run(app, workload, threads, seconds, users):
+    counter = itertools.count()
+    done, errors = [0] * threads, [0] * threads
+    deadline = time.monotonic() + seconds
+
+    def worker(index):
+        with app.app_context():
+            while time.monotonic() < deadline:
+                try:
+                    workload(users, counter)
+                    done[index] += 1
+                except OperationalError:
+                    db.session.rollback()
+                    errors[index] += 1
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(done) / seconds, sum(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare default and production SQLite settings')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--users', type=int, default=10000, help='users seeded before each run')
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix='vt-bench-')
+    print(f"// {args.threads} threads, {args.seconds:g}s per run, {args.users} users //")
+    print(f"{'workload':<10} {'profile':<11} {'ops/s':>9} {'errors':>7}")
+    try:
+        for name, workload in WORKLOADS.items():
+            results = {}
+            for production in (False, True):
+                path = os.path.join(workdir, f'{name}-{int(production)}.db')
+                app = build_app(path, production)
+                seed(app, args.users)
+                results[production] = run(app, workload, args.threads, args.seconds, args.users)
+                with app.app_context():
+                    db.session.remove()
+                    for engine in db.engines.values():
+                        engine.dispose()
+
+                rate, errors = results[production]
+                print(f"{name:<10} {'production' if production else 'default':<11} {rate:>9.0f} {errors:>7}")
+            base = results[False][0]
+            if base:
+                print(f"{'':<10} {'speedup':<11} {results[True][0] / base:>8.2f}x")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
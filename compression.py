@@ -0,0 +1,168 @@
+import gzip
+import logging
+import mimetypes
+import os
+
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # Only gzip siblings are written and served
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Static files worth compressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.html', '.svg', '.json', '.txt', '.map', '.wav'}
+
+# Content-Encoding -> file suffix, in order of preference
+_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+_DYNAMIC_TYPES = {'text/html'}
+
+
+def _write(path, data):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def precompress(static_folder, min_size=256):
+    """Write .gz (and .br, with brotli installed) next to each compressible file.
+
+    Siblings that are newer than their source are left alone, and one is
+    only kept if it is actually smaller. Returns the number written.
+    """
+    written = 0
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            if stat.st_size < min_size:
+                continue
+
+            data = None
+            for encoding, suffix in _VARIANTS:
+                if encoding == 'br' and brotli is None:
+                    continue
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= stat.st_mtime:
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                if encoding == 'br':
+                    compressed = brotli.compress(data, quality=11)
+                else:
+                    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) < len(data):
+                    _write(target, compressed)
+                    written += 1
+                elif os.path.exists(target):
+                    os.remove(target)
+    return written
+
+
+def _accepts(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+class Compression:
+    """Compressed responses for static files and large HTML pages.
+
+    The static route serves a precompressed .br or .gz sibling when the
+    client accepts it and the sibling is at least as new as the file.
+    send_file gives each variant its own ETag and answers conditional
+    requests with 304. HTML responses of COMPRESS_MIN_SIZE bytes or more
+    are gzipped (or brotli'd) as they leave the app. Siblings are built at
+    startup unless STATIC_PRECOMPRESS is off; `python assets.py build`
+    builds them ahead of time. Pages stored by response_cache keep their
+    compressed bytes, so a cache hit is not compressed again.
+    """
+
+    def __init__(self):
+        self.min_size = 1024
+        self.level = 6
+
+    def init_app(self, app):
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.level = app.config.get('COMPRESS_LEVEL', self.level)
+
+        if app.config.get('STATIC_PRECOMPRESS', True):
+            try:
+                precompress(app.static_folder)
+            except OSError as e:
+                logger.warning('Serving uncompressed static files, precompression failed: %s', e)
+
+        if app.has_static_folder:
+            app.view_functions['static'] = self.send_static
+        app.after_request(self._compress_response)
+        app.extensions['compression'] = self
+
+    @staticmethod
+    def send_static(filename):
+        """Flask's static view, preferring a precompressed variant"""
+        app = current_app
+        max_age = app.get_send_file_max_age(filename)
+        if os.path.splitext(filename)[1] in COMPRESSIBLE_EXTENSIONS:
+            for encoding, suffix in _VARIANTS:
+                if not _accepts(encoding):
+                    continue
+                path = os.path.join(app.static_folder, filename)
+                try:
+                    if os.stat(path + suffix).st_mtime < os.stat(path).st_mtime:
+                        continue
+                except (OSError, ValueError):
+                    continue
+                response = send_from_directory(
+                    app.static_folder, filename + suffix, max_age=max_age,
+                    mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                )
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                return response
+
+            response = send_from_directory(app.static_folder, filename, max_age=max_age)
+            response.vary.add('Accept-Encoding')
+            return response
+        return send_from_directory(app.static_folder, filename, max_age=max_age)
+
+    def negotiate(self, mimetype, size):
+        """Content-Encoding to send a response of this type and size in, or None"""
+        if mimetype not in _DYNAMIC_TYPES or (size is not None and size < self.min_size):
+            return None
+        if brotli is not None and _accepts('br'):
+            return 'br'
+        if _accepts('gzip'):
+            return 'gzip'
+        return None
+
+    def compress(self, data, encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=min(self.level, 11))
+        return gzip.compress(data, compresslevel=self.level)
+
+    def _compress_response(self, response):
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in _DYNAMIC_TYPES or 'Content-Encoding' in response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.negotiate(response.mimetype, response.content_length)
+        if encoding is None:
+            return response
+
+        response.set_data(self.compress(response.get_data(), encoding))
+        response.headers['Content-Encoding'] = encoding
+        tag, weak = response.get_etag()
+        if tag and not weak:
+            # The compressed bytes differ, so the validator can only be
+            # weak; If-None-Match compares weakly, so 304s still work
+            response.set_etag(tag, weak=True)
+        return response
+
+
+# Shared instance, bound to an app with compression.init_app(app)
+compression = Compression()
@@ -12,16 +12,81 @@ class Config:
     SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
     PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)
     
-    # Password hashing
-    HASH_METHOD = 'pbkdf2:sha256'
+    # Server-side sessions (see session_store.py)
+    SESSION_STORE = os.environ.get('SESSION_STORE') or 'cookie'  # 'sqlite' shares them between workers, 'memory' = one process only
+    SESSION_STORE_PATH = os.environ.get('SESSION_STORE_PATH')  # default: instance/sessions.db
+    SESSION_SWEEP_INTERVAL = 60  # seconds between expired-session sweeps
+
+    # Templates
+    TEMPLATE_BYTECODE_CACHE_DIR = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR')  # None = instance/jinja_cache
+    TEMPLATE_FRAGMENT_CACHE = True
+    ASSETS_BUNDLE = True  # fingerprinted CSS/JS bundles (assets.py); False serves the source files
+    ASSETS_MINIFY = True
+    STATIC_PRECOMPRESS = True  # write .gz/.br siblings of static files at startup
+    COMPRESS_MIN_SIZE = 1024  # bytes; smaller HTML responses are sent uncompressed
+    COMPRESS_LEVEL = 6
+    RESPONSE_CACHE_SIZE = 1024  # rendered pages kept by @response_cache.cached(); 0 disables
+    RESPONSE_CACHE_TTL = 300  # seconds
+    
+    # Password hashing (see password_hashing.py); stored hashes that don't
+    # match are upgraded on the next successful login
+    HASH_METHOD = 'pbkdf2:sha256'  # or 'scrypt'
     HASH_SALT_LENGTH = 16
-    HASH_ITERATIONS = 260000
+    HASH_ITERATIONS = 600000  # werkzeug's default; stored hashes are never downgraded
+    HASH_SCRYPT_N = 32768
+    HASH_SCRYPT_R = 8
+    HASH_SCRYPT_P = 1
+    
+    # Hash verification pool (see hash_pool.py)
+    HASH_POOL_WORKERS = None  # None = one per CPU, 0 = verify inline
+    HASH_POOL_MAX_PENDING = None  # None = four per worker
+    HASH_POOL_TIMEOUT = 10  # seconds
+    
+    # Password strength meter
+    COMMON_PASSWORDS_INDEX = os.environ.get('COMMON_PASSWORDS_INDEX') or 'common_passwords.idx'
+    STRENGTH_CACHE_SIZE = int(os.environ.get('STRENGTH_CACHE_SIZE') or 4096)  # 0 disables
+    STRENGTH_CACHE_TTL = 300  # seconds
     
     # Application settings
     APP_NAME = "Vault-Tec Secure System"
     APP_VERSION = "3000-MKIV"
     MAX_LOGIN_ATTEMPTS = 5
+    MAX_LOGIN_ATTEMPTS_PER_IP = 20
     LOCKOUT_TIME = 300  # 5 minutes in seconds
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND') or 'memory'  # or redis://host:6379/0
+    
+    # Background audit writer for LoginAttempt/SecurityLog rows
+    AUDIT_BATCH_SIZE = 200
+    AUDIT_FLUSH_INTERVAL = 1.0  # seconds
+    AUDIT_MAX_QUEUE = 10000  # rows beyond this are dropped and counted
+    
+    # Audit retention (see retention.py)
+    LOGIN_ATTEMPT_RETENTION_DAYS = 30
+    SECURITY_LOG_RETENTION_DAYS = 90  # older rows survive only as daily counts
+    RETENTION_BATCH_SIZE = 5000
+    
+    # Flask-Login user snapshots (see user_cache.py)
+    USER_CACHE_TTL = 60  # seconds another worker may serve a changed user's old snapshot
+    USER_CACHE_SIZE = 10000  # 0 disables
+    
+    # Batched last_login writes (see last_login.py)
+    LAST_LOGIN_FLUSH_INTERVAL = 30  # seconds
+    LAST_LOGIN_BATCH_SIZE = 300  # users per UPDATE statement
+    
+    # SQLite production profile (see sqlite_profile.py): WAL and pragmas,
+    # one pooled writer and a pool of query_only readers
+    SQLITE_PRODUCTION = False
+    SQLITE_WRITE_POOL_SIZE = 1
+    SQLITE_READ_POOL_SIZE = 8
+    SQLITE_BUSY_TIMEOUT = 5  # seconds
+    
+    # Reporting replica (see db_routing.py); dashboard counts, admin listing,
+    # exports and security reports read from it when set
+    SQLALCHEMY_REPLICA_URI = os.environ.get('DATABASE_REPLICA_URL')
+    
+    # Admin user listing
+    ADMIN_USERS_PER_PAGE = 50
+    EXPORT_BATCH_SIZE = 1000  # rows fetched per round trip by the user export
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -31,9 +96,12 @@ class ProductionConfig(Config):
     DEBUG = False
     TESTING = False
     SESSION_COOKIE_SECURE = True
+    SQLITE_PRODUCTION = True
+    SESSION_STORE = os.environ.get('SESSION_STORE') or 'sqlite'
 
 class TestingConfig(Config):
     TESTING = True
+    HASH_POOL_WORKERS = 0
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
 
 # Configuration dictionary
@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+
+from flask import current_app
+from flask_sqlalchemy.session import Session
+
+# Bind key of the local read-only engine added by the SQLite production profile
+READ_BIND = 'reader'
+
+# Bind key of the reporting replica (SQLALCHEMY_REPLICA_URI)
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a read engine when one is bound.
+
+    Inside reporting() SELECTs go to the replica, otherwise to the local
+    read engine. Flushes, DML and textual statements use the default
+    (primary) engine. Once a transaction has written, everything after it
+    does too, so it reads its own uncommitted changes. Without either bind
+    this behaves exactly like Flask-SQLAlchemy's Session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            engines = self._db.engines
+            if READ_BIND in engines or REPLICA_BIND in engines:
+                if not self._flushing and not self.info.get('wrote') and getattr(clause, 'is_select', False):
+                    if self.info.get('reporting') and REPLICA_BIND in engines:
+                        return engines[REPLICA_BIND]
+                    if READ_BIND in engines:
+                        return engines[READ_BIND]
+                else:
+                    self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self):
+        super().commit()
+        self.info.pop('wrote', None)
+
+    def rollback(self):
+        try:
+            super().rollback()
+        finally:
+            self.info.pop('wrote', None)
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self.info.pop('wrote', None)
+
+
+def configure_replica(app):
+    """Add the replica bind from SQLALCHEMY_REPLICA_URI; call before the db is bound"""
+    uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if not uri:
+        return False
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    binds[REPLICA_BIND] = uri
+    app.config['SQLALCHEMY_BINDS'] = binds
+    return True
+
+
+@contextmanager
+def reporting():
+    """Send the SELECTs in this block to the replica, if one is configured.
+
+    Replica rows may lag the primary, so use it for dashboards and reports,
+    never for checks that guard a write. Also works as a decorator.
+    """
+    session = current_app.extensions['sqlalchemy'].session()
+    previous = session.info.get('reporting', False)
+    session.info['reporting'] = True
+    try:
+        yield session
+    finally:
+        session.info['reporting'] = previous
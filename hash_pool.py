@@ -0,0 +1,127 @@
+import atexit
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashPoolSaturated(Exception):
+    """Raised when the verification queue is full and the request should be shed"""
+
+
+class HashVerificationPool:
+    """Run password hash verification (and rehashing) in a bounded pool of worker processes.
+
+    PBKDF2 verification is deliberately slow. Running it on request
+    threads lets a burst of logins take every CPU, so cheap pages stall
+    too. Here it runs on a fixed number of processes, and at most
+    `max_pending` checks can be queued or running. Any extra check fails
+    with HashPoolSaturated straight away.
+
+    Until init_app() is called, checks run inline on the calling thread,
+    so scripts such as init_db.py behave as before.
+    """
+
+    def __init__(self, app=None):
+        self.workers = 0
+        self.max_pending = 0
+        self.timeout = None
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read pool sizing from the app config"""
+        workers = app.config.get('HASH_POOL_WORKERS')
+        self.workers = (os.cpu_count() or 1) if workers is None else workers  # 0 runs checks inline
+        self.max_pending = app.config.get('HASH_POOL_MAX_PENDING') or self.workers * 4
+        self.timeout = app.config.get('HASH_POOL_TIMEOUT', 10)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        app.extensions['hash_pool'] = self
+
+    @property
+    def enabled(self):
+        return self.workers > 0 and self._slots is not None
+
+    def _get_executor(self):
+        # Started on first use so importing the app never forks
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=_worker_context()
+                    )
+                    atexit.register(self.shutdown)
+        return self._executor
+
+    def check_password_hash(self, pwhash, password):
+        """Verify a password in the pool; raises HashPoolSaturated under overload"""
+        return self._run(check_password_hash, pwhash, password)
+
+    def generate_password_hash(self, password, method, salt_length):
+        """Hash a password in the pool; raises HashPoolSaturated under overload"""
+        return self._run(generate_password_hash, password, method, salt_length)
+
+    def _run(self, func, *args):
+        if not self.enabled:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise HashPoolSaturated('Password hashing queue is full')
+
+        try:
+            executor = self._get_executor()
+            # Workers start inside submit(); keep the app's entry script out of them
+            with self._submit_lock:
+                main, sys.modules['__main__'] = sys.modules['__main__'], _WORKER_MAIN
+                try:
+                    future = executor.submit(func, *args)
+                finally:
+                    sys.modules['__main__'] = main
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the work is finished, even if we stop waiting
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashPoolSaturated('Password hashing timed out')
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Workers only run werkzeug's hash functions. multiprocessing re-imports
+# the parent's __main__ in each new worker, which for `python main.py`
+# would build a second app there (database, sessions, static
+# precompression); workers are started with this empty module as
+# __main__ instead.
+_WORKER_MAIN = types.ModuleType('__main__')
+
+
+def _worker_context():
+    """Start workers without forking the threaded web process"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['hash_pool', 'password_hashing'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+# Shared instance, bound to an app with hash_pool.init_app(app)
+hash_pool = HashVerificationPool()
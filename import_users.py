@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Bulk user import for the Vault-Tec Secure System
+
+Reads users from CSV (header: username,email,password[,role]) or JSON
+Lines (one object per line with the same keys). Every row is validated,
+and rows whose username or email already exists, in the database or
+earlier in the file, are reported and skipped. Passwords are hashed
+under the configured policy on every core, and users are inserted in
+batches of one executemany INSERT per transaction.
+
+    python import_users.py users.csv
+    python import_users.py users.jsonl --workers 8 --batch-size 2000
+    python import_users.py users.csv --dry-run
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from flask import Flask
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from config import config
+from models import User, db
+from password_hashing import hashing_policy
+from security import InputValidator
+
+ROLES = ('user', 'admin')
+
+# Existing usernames/emails are looked up this many at a time
+_LOOKUP_CHUNK = 500
+
+
+def read_records(path):
+    """Yield (line_number, record) from a .csv or .jsonl/.ndjson file.
+
+    A JSON line that doesn't parse is yielded as its JSONDecodeError, so
+    validate_records reports it with the other bad rows.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, e
+        else:
+            # Line 1 is the header
+            for line_number, row in enumerate(csv.DictReader(f), 2):
+                yield line_number, row
+
+
+def validate_records(records):
+    """Split records into (valid, errors), dropping duplicates within the file.
+
+    valid holds (line_number, username, email, password, role); errors
+    holds (line_number, message).
+    """
+    valid, errors = [], []
+    usernames, emails = set(), set()
+
+    for line_number, record in records:
+        if isinstance(record, json.JSONDecodeError):
+            errors.append((line_number, f'invalid JSON: {record.msg}'))
+            continue
+        if not isinstance(record, dict):
+            errors.append((line_number, 'expected a JSON object'))
+            continue
+
+        fields = {key: record.get(key) or default
+                  for key, default in (('username', ''), ('email', ''), ('password', ''), ('role', 'user'))}
+        wrong_type = [key for key, value in fields.items() if not isinstance(value, str)]
+        if wrong_type:
+            errors.append((line_number, f'{wrong_type[0]} must be a string'))
+            continue
+
+        username = fields['username'].strip()
+        email = fields['email'].strip()
+        password = fields['password']
+        role = fields['role'].strip().lower()
+
+        if not InputValidator.validate_username(username):
+            errors.append((line_number, f'invalid username {username!r}'))
+        elif not InputValidator.validate_email(email):
+            errors.append((line_number, f'invalid email {email!r}'))
+        elif not password:
+            errors.append((line_number, 'missing password'))
+        elif role not in ROLES:
+            errors.append((line_number, f'unknown role {role!r}'))
+        elif username in usernames:
+            errors.append((line_number, f'duplicate username {username!r} in file'))
+        elif email in emails:
+            errors.append((line_number, f'duplicate email {email!r} in file'))
+        else:
+            usernames.add(username)
+            emails.add(email)
+            valid.append((line_number, username, email, password, role))
+
+    return valid, errors
+
+
+def find_conflicts(valid):
+    """Split valid rows into (new, errors) against users already in the database"""
+    taken_usernames, taken_emails = set(), set()
+    for start in range(0, len(valid), _LOOKUP_CHUNK):
+        chunk = valid[start:start + _LOOKUP_CHUNK]
+        taken_usernames.update(row.username for row in db.session.query(User.username)
+                               .filter(User.username.in_([item[1] for item in chunk])))
+        taken_emails.update(row.email for row in db.session.query(User.email)
+                            .filter(User.email.in_([item[2] for item in chunk])))
+
+    new, errors = [], []
+    for item in valid:
+        line_number, username, email = item[:3]
+        if username in taken_usernames:
+            errors.append((line_number, f'username {username!r} already exists'))
+        elif email in taken_emails:
+            errors.append((line_number, f'email {email!r} already exists'))
+        else:
+            new.append(item)
+    return new, errors
+
+
+def import_users(rows, workers=None, batch_size=1000, progress=None):
+    """Hash and insert validated, conflict-free rows; returns (inserted, errors).
+
+    Batches are hashed in a process pool while earlier batches are being
+    inserted. A batch that hits a unique constraint anyway, e.g. from a
+    concurrent registration, is retried row by row so only the
+    conflicting rows are lost. Needs an app context.
+    """
+    method, salt_length = hashing_policy.method, hashing_policy.salt_length
+    inserted, errors = 0, []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        hashes = executor.map(
+            generate_password_hash,
+            (row[3] for row in rows),
+            repeat(method),
+            repeat(salt_length),
+            chunksize=64
+        )
+        for start in range(0, len(rows), batch_size):
+            batch = [
+                (line_number, dict(username=username, email=email, role=role, password_hash=next(hashes)))
+                for line_number, username, email, _, role in rows[start:start + batch_size]
+            ]
+            count, batch_errors = _insert_batch(batch)
+            inserted += count
+            errors.extend(batch_errors)
+            if progress:
+                progress(inserted, len(rows))
+
+    return inserted, errors
+
+
+def _insert_batch(batch):
+    try:
+        db.session.execute(User.__table__.insert(), [values for _, values in batch])
+        db.session.commit()
+        return len(batch), []
+    except IntegrityError:
+        db.session.rollback()
+
+    inserted, errors = 0, []
+    for line_number, values in batch:
+        try:
+            db.session.execute(User.__table__.insert(), values)
+            db.session.commit()
+            inserted += 1
+        except IntegrityError:
+            db.session.rollback()
+            errors.append((line_number, f"username {values['username']!r} or email {values['email']!r} already exists"))
+    return inserted, errors
+
+
+def create_app():
+    """Minimal app bound to the configured database and hashing policy"""
+    app = Flask(__name__)
+    app.config.from_object(config[os.environ.get('FLASK_ENV', 'default')])
+    db.init_app(app)
+    hashing_policy.init_app(app)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import Vault-Tec users from CSV or JSON Lines')
+    parser.add_argument('path', help='users.csv or users.jsonl')
+    parser.add_argument('--workers', type=int, help='hashing processes (default: one per CPU)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='users per INSERT transaction')
+    parser.add_argument('--dry-run', action='store_true', help='validate and check conflicts only')
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    started = time.perf_counter()
+    with app.app_context():
+        db.create_all()
+
+        try:
+            valid, errors = validate_records(read_records(args.path))
+        except (OSError, ValueError) as e:
+            print(f"✗ Could not read {args.path}: {e}")
+            sys.exit(1)
+        rows, conflicts = find_conflicts(valid)
+        errors.extend(conflicts)
+
+        if args.dry_run:
+            inserted = 0
+        else:
+            def progress(done, total):
+                print(f"  {done}/{total} imported", end='\r', flush=True)
+
+            inserted, insert_errors = import_users(rows, args.workers, args.batch_size, progress)
+            errors.extend(insert_errors)
+            print()
+
+    for line_number, message in sorted(errors)[:50]:
+        print(f"  line {line_number}: {message}")
+    if len(errors) > 50:
+        print(f"  ... and {len(errors) - 50} more")
+
+    elapsed = time.perf_counter() - started
+    if args.dry_run:
+        print(f"✓ {len(rows)} users ready to import, {len(errors)} rejected")
+    else:
+        print(f"✓ Imported {inserted} users in {elapsed:.1f}s, {len(errors)} rejected")
+    if errors:
+        sys.exit(2)
+
+
+if __name__ == '__main__':
+    main()
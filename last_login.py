@@ -0,0 +1,125 @@
+import atexit
+import threading
+from datetime import datetime
+
+from sqlalchemy import case
+
+
+class LastLoginBuffer:
+    """Collect last-login times in memory and write them in batched UPDATEs.
+
+    Logins only record (user id, time) in a dict, so several logins by
+    one user between flushes cost a single row update. A background
+    thread writes the pending times every `flush_interval` seconds as
+    `UPDATE users SET last_login = CASE id WHEN ... END WHERE id IN (...)`,
+    up to `batch_size` users per statement, in one transaction. Pending
+    times are readable through get(), so status colours in this process
+    are exact. The buffer is flushed at interpreter exit.
+
+    Until init_app() is called, record() returns False and callers write
+    the column themselves.
+    """
+
+    def __init__(self, flush_interval=30.0, batch_size=300):
+        self.app = None
+        self.db = None
+        self.user_model = None
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.written = 0
+        self.failed = 0
+
+    def init_app(self, app, db, user_model):
+        self.app = app
+        self.db = db
+        self.user_model = user_model
+        self.flush_interval = app.config.get('LAST_LOGIN_FLUSH_INTERVAL', self.flush_interval)
+        self.batch_size = app.config.get('LAST_LOGIN_BATCH_SIZE', self.batch_size)
+        app.extensions['last_login_buffer'] = self
+        atexit.register(self.shutdown)
+
+    def record(self, user_id, when=None):
+        """Buffer a login time; returns False if the buffer isn't bound to an app"""
+        if self.app is None:
+            return False
+        self._ensure_started()
+        with self._lock:
+            self._pending[user_id] = when or datetime.utcnow()
+        return True
+
+    def get(self, user_id, default=None):
+        """Buffered login time for user_id, or default if none is pending"""
+        with self._lock:
+            return self._pending.get(user_id, default)
+
+    def _ensure_started(self):
+        # Started on first use so it runs in the worker, not a pre-fork master
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._stopping.clear()
+                    self._thread = threading.Thread(target=self._run, name='last-login-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Write every pending login time now; returns the number of users updated"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        items = list(pending.items())
+        table = self.user_model.__table__
+        try:
+            with self.app.app_context():
+                with self.db.engine.begin() as connection:
+                    for start in range(0, len(items), self.batch_size):
+                        batch = dict(items[start:start + self.batch_size])
+                        connection.execute(
+                            table.update()
+                            .where(table.c.id.in_(list(batch)))
+                            .values(last_login=case(batch, value=table.c.id))
+                        )
+        except Exception as e:
+            with self._lock:
+                # Put them back unless a newer login arrived meanwhile
+                for user_id, when in pending.items():
+                    if self._pending.get(user_id, when) <= when:
+                        self._pending[user_id] = when
+                self.failed += 1
+            self.app.logger.error(f"Failed to write {len(pending)} last-login times: {e}")
+            return 0
+
+        with self._lock:
+            self.written += len(pending)
+        return len(pending)
+
+    def shutdown(self, timeout=5.0):
+        """Stop the writer thread after a final flush"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'written': self.written,
+                'failed': self.failed
+            }
+
+
+# Shared instance, bound with last_login_buffer.init_app(app, db, User)
+last_login_buffer = LastLoginBuffer()
@@ -1,12 +1,30 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import os
-import re
 import random
 
+from hash_pool import HashPoolSaturated, hash_pool
+from password_hashing import hashing_policy
+from db_routing import RoutingSession, configure_replica
+from sqlite_profile import sqlite_profile
+from rate_limit import login_limiter
+from user_stats import user_stats
+from user_cache import UserSnapshot, user_cache
+from last_login import last_login_buffer
+from user_listing import list_users
+from registration import register_user
+from session_store import session_store
+from security import SessionSecurity
+from template_cache import LazyValue, template_cache
+from assets import assets
+from compression import compression
+from response_cache import response_cache
+from user_export import EXPORT_FORMATS, export_users_response
+from password_corpus import open_index
+from password_strength import PasswordStrengthMeter, StrengthResultCache
+
 # ============================================
 # INITIALIZATION
 # ============================================
@@ -15,23 +33,78 @@ app = Flask(__name__,
     static_url_path='/static'
 )
 
+PRODUCTION = os.environ.get('FLASK_ENV') == 'production'
+
 app.config['SECRET_KEY'] = 'vault-tec-secure-key-2077'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pipboy.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
 app.config['PERMANENT_SESSION_LIFETIME'] = 1800  # 30 minutes
+app.config['SESSION_STORE'] = os.environ.get('SESSION_STORE') or ('sqlite' if PRODUCTION else 'cookie')  # 'memory' = one process only
+app.config['SESSION_SWEEP_INTERVAL'] = 60  # seconds between expired-session sweeps
+app.config['HASH_METHOD'] = 'pbkdf2:sha256'  # or 'scrypt'; see password_hashing.py
+app.config['HASH_ITERATIONS'] = 600000  # werkzeug's default; stored hashes are never downgraded
+app.config['HASH_SALT_LENGTH'] = 16
+app.config['MAX_LOGIN_ATTEMPTS'] = 5
+app.config['MAX_LOGIN_ATTEMPTS_PER_IP'] = 20
+app.config['LOCKOUT_TIME'] = 300  # seconds
+app.config['RATE_LIMIT_BACKEND'] = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # or redis://host:6379/0
+app.config['USER_STATS_RECONCILE_INTERVAL'] = 300  # seconds between dashboard count reloads
+app.config['USER_CACHE_TTL'] = 60  # seconds other workers may serve a changed user's old snapshot
+app.config['USER_CACHE_SIZE'] = 10000  # 0 disables
+app.config['LAST_LOGIN_FLUSH_INTERVAL'] = 30  # seconds between batched last_login writes
+app.config['LAST_LOGIN_BATCH_SIZE'] = 300  # users per UPDATE statement
+app.config['HASH_POOL_WORKERS'] = None  # one per CPU, 0 = verify inline
+app.config['HASH_POOL_MAX_PENDING'] = None  # four per worker
+app.config['HASH_POOL_TIMEOUT'] = 10  # seconds
+app.config['PASSWORD_BATCH_LIMIT'] = 10000  # passwords per /api/check-password/batch call
+app.config['PASSWORD_MAX_LENGTH'] = 256  # characters per password in a batch call
+app.config['COMMON_PASSWORDS_INDEX'] = os.environ.get('COMMON_PASSWORDS_INDEX', 'common_passwords.idx')
+app.config['STRENGTH_CACHE_SIZE'] = int(os.environ.get('STRENGTH_CACHE_SIZE', 4096))  # 0 disables
+app.config['STRENGTH_CACHE_TTL'] = 300  # seconds
+app.config['ADMIN_USERS_PER_PAGE'] = 50
+app.config['EXPORT_BATCH_SIZE'] = 1000  # rows fetched per round trip by /api/admin/export-users
+app.config['SQLITE_PRODUCTION'] = PRODUCTION  # WAL, pragmas, read/write pools
+app.config['SQLITE_WRITE_POOL_SIZE'] = 1  # SQLite allows one writer at a time
+app.config['SQLITE_READ_POOL_SIZE'] = 8
+app.config['SQLALCHEMY_REPLICA_URI'] = os.environ.get('DATABASE_REPLICA_URL')  # reporting reads; None = primary
+app.config['TEMPLATE_BYTECODE_CACHE_DIR'] = os.environ.get('TEMPLATE_BYTECODE_CACHE_DIR')  # None = instance/jinja_cache
+app.config['TEMPLATE_FRAGMENT_CACHE'] = True  # {% cache %} blocks in layout.html; off while debugging templates
+app.config['ASSETS_BUNDLE'] = True  # fingerprinted CSS/JS bundles (assets.py); False serves the source files
+app.config['STATIC_PRECOMPRESS'] = True  # write .gz/.br siblings of static files at startup
+app.config['COMPRESS_MIN_SIZE'] = 1024  # bytes; smaller HTML responses are sent uncompressed
+app.config['RESPONSE_CACHE_SIZE'] = 1024  # rendered pages kept by @response_cache.cached(); 0 disables
+app.config['RESPONSE_CACHE_TTL'] = 300  # seconds
 
-db = SQLAlchemy(app)
+sqlite_profile.configure(app)
+configure_replica(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+sqlite_profile.init_app(app, db)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 login_manager.login_message = '// ACCESS DENIED: Authentication required //'
 login_manager.login_message_category = 'error'
 
+# Server-side sessions; the cookie only carries the session id
+session_store.init_app(app)
+hash_pool.init_app(app)
+hashing_policy.init_app(app)
+login_limiter.init_app(app)
+template_cache.init_app(app)
+assets.init_app(app)
+compression.init_app(app)
+response_cache.init_app(app)
+
 # ============================================
 # MODELS
 # ============================================
 class User(UserMixin, db.Model):
+    __table_args__ = (
+        # Keyset pagination for the admin user listing
+        db.Index('ix_user_created_at_id', 'created_at', 'id'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
@@ -41,23 +114,39 @@ class User(UserMixin, db.Model):
     last_login = db.Column(db.DateTime)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hashing_policy.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Upgrades hashes made under an older policy; update_last_login commits it
+        return hashing_policy.verify(self, password, pool=hash_pool)
     
     def is_admin(self):
         return self.role == 'admin'
     
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'role': self.role,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_login': self.last_login.isoformat() if self.last_login else None
+        }
+    
     def update_last_login(self):
-        self.last_login = datetime.utcnow()
-        db.session.commit()
+        # last_login is buffered and written in batches; a hash upgraded
+        # by check_password is still committed here
+        if not last_login_buffer.record(self.id):
+            self.last_login = datetime.utcnow()
+        if db.session.is_modified(self):
+            db.session.commit()
         
     def get_status_color(self):
         """Return status color based on activity"""
-        if not self.last_login:
+        last_login = last_login_buffer.get(self.id, self.last_login)
+        if not last_login:
             return "#FF9900"  # Orange - never logged in
-        days_since = (datetime.utcnow() - self.last_login).days
+        days_since = (datetime.utcnow() - last_login).days
         if days_since < 1:
             return "#00FF00"  # Green - active today
         elif days_since < 7:
@@ -65,108 +154,63 @@ class User(UserMixin, db.Model):
         else:
             return "#FF3300"  # Red - inactive
 
+class CachedUser(UserSnapshot):
+    """current_user for this app; is_admin() is a method, as on User"""
+    __slots__ = ()
+    
+    def is_admin(self):
+        return self.role == 'admin'
+
+# current_user comes from a per-process snapshot cache, not a query per request
+user_cache.init_app(app, db, User, snapshot_type=CachedUser)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return user_cache.load(user_id)
+
+# Login times are written in batches instead of one commit per login
+last_login_buffer.init_app(app, db, User)
+
+# Dashboard counts kept in memory, updated as users are committed
+user_stats.init_app(app, db, User)
 
 # ============================================
 # PASSWORD STRENGTH METER
 # ============================================
-class PasswordStrengthMeter:
-    def __init__(self):
-        self.common_passwords = [
-            'password', '123456', '12345678', '123456789', '12345',
-            'qwerty', 'abc123', 'password1', 'admin', 'letmein',
-            'welcome', 'monkey', 'dragon', 'football', 'baseball'
-        ]
-    
-    def calculate_strength(self, password):
-        score = 0
-        feedback = []
-        
-        # Length check
-        if len(password) >= 8:
-            score += 15
-            if len(password) >= 12:
-                score += 10
-            else:
-                feedback.append("Consider longer sequence (12+ characters)")
-        else:
-            feedback.append("Minimum 8 characters required")
-        
-        # Character variety
-        has_upper = re.search(r'[A-Z]', password)
-        has_lower = re.search(r'[a-z]', password)
-        has_digit = re.search(r'\d', password)
-        has_special = re.search(r'[!@#$%^&*(),.?":{}|<>]', password)
-        
-        if has_upper:
-            score += 15
-        else:
-            feedback.append("Add UPPERCASE letters")
-        
-        if has_lower:
-            score += 15
-        else:
-            feedback.append("Add lowercase letters")
-        
-        if has_digit:
-            score += 15
-        else:
-            feedback.append("Add numbers (0-9)")
-        
-        if has_special:
-            score += 20
-        else:
-            feedback.append("Add special characters")
-        
-        # Common password check
-        if password.lower() in self.common_passwords:
-            score = max(10, score - 30)
-            feedback.insert(0, "CRITICAL: Common password detected")
-        
-        # Final score
-        score = min(100, max(0, score))
-        
-        # Categorization
-        if score >= 80:
-            category = "STRONG // VAULT-TEC APPROVED"
-            color = "#00FF00"
-        elif score >= 60:
-            category = "GOOD // SECURE"
-            color = "#99FF33"
-        elif score >= 40:
-            category = "MODERATE // ACCEPTABLE"
-            color = "#FFFF00"
-        elif score >= 20:
-            category = "WEAK // SECURITY RISK"
-            color = "#FF9900"
-        else:
-            category = "CRITICAL FAILURE"
-            color = "#FF3300"
-        
-        return {
-            'score': score,
-            'category': category,
-            'color': color,
-            'feedback': feedback,
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'scan_id': f"SCAN-{datetime.now().timestamp():.0f}"
-        }
+def load_common_password_index():
+    return open_index(app.config['COMMON_PASSWORDS_INDEX'])
+
+# Shared by all request threads; the corpus is opened on the first check
+strength_meter = PasswordStrengthMeter(corpus_loader=load_common_password_index)
+
+# Typing and backspacing resend the same passwords; reuse their results
+strength_cache = StrengthResultCache(
+    strength_meter,
+    max_entries=app.config['STRENGTH_CACHE_SIZE'],
+    ttl=app.config['STRENGTH_CACHE_TTL']
+)
 
 # ============================================
 # CONTEXT PROCESSORS
 # ============================================
 @app.context_processor
 def inject_session_data():
-    """Inject session data into all templates"""
+    """Inject session data into all templates; the readings are only computed if printed"""
     return {
         'session': session,
-        'current_year': datetime.now().year,
-        'random_rads': f"{random.uniform(0.0, 0.5):.1f}",
-        'system_time': datetime.now().strftime("%H:%M:%S")
+        'current_year': LazyValue(lambda: datetime.now().year),
+        'random_rads': LazyValue(lambda: f"{random.uniform(0.0, 0.5):.1f}"),
+        'system_time': LazyValue(lambda: datetime.now().strftime("%H:%M:%S"))
     }
 
+# ============================================
+# REQUEST HOOKS
+# ============================================
+@app.before_request
+def check_session():
+    """Clear a session presented by another client than the one it was issued to"""
+    SessionSecurity.validate_session()
+
 # ============================================
 # ROUTES
 # ============================================
@@ -185,9 +229,20 @@ def login():
         username = request.form.get('username', '')
         password = request.form.get('password', '')
         
+        if login_limiter.is_limited(username, request.remote_addr):
+            flash('ERROR: Too many failed attempts. Terminal locked for 5 minutes.', 'error')
+            return render_template('login.html'), 429
+        
         user = User.query.filter_by(username=username).first()
         
-        if user and user.check_password(password):
+        try:
+            is_valid = user and user.check_password(password)
+        except HashPoolSaturated:
+            flash('ERROR: Authentication systems overloaded. Try again shortly.', 'error')
+            return render_template('login.html'), 503
+        
+        if is_valid:
+            SessionSecurity.rotate_session()  # New session id against fixation, bound to this client
             login_user(user)
             user.update_last_login()
             
@@ -198,6 +253,7 @@ def login():
             flash(f'ACCESS GRANTED. Welcome, {username}!', 'success')
             return redirect(url_for('dashboard'))
         else:
+            login_limiter.record_failure(username, request.remote_addr)
             flash('ERROR: Invalid credentials. Access denied.', 'error')
     
     return render_template('login.html')
@@ -227,20 +283,18 @@ def register():
         if password != confirm_password:
             errors.append('Passwords do not match')
         
-        if User.query.filter_by(username=username).first():
-            errors.append('Username already exists')
-        
-        if User.query.filter_by(email=email).first():
-            errors.append('Email already registered')
+        if not errors:
+            # One probe, then an INSERT the unique indexes arbitrate
+            new_user, taken = register_user(db, User, username, email, password)
+            if 'username' in taken:
+                errors.append('Username already exists')
+            if 'email' in taken:
+                errors.append('Email already registered')
         
         if errors:
             for error in errors:
                 flash(f'ERROR: {error}', 'error')
         else:
-            new_user = User(username=username, email=email, role='user')
-            new_user.set_password(password)
-            db.session.add(new_user)
-            db.session.commit()
             flash('SUCCESS: Registration complete! Please login.', 'success')
             return redirect(url_for('login'))
     
@@ -249,12 +303,8 @@ def register():
 @app.route('/dashboard')
 @login_required
 def dashboard():
-    # Generate some stats for the dashboard
-    user_count = User.query.count()
-    admin_count = User.query.filter_by(role='admin').count()
-    
-    # Get recent users (last 5)
-    recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
+    # Stats and the last 5 users come from memory, not the database
+    user_count, admin_count, recent_users = user_stats.snapshot()
     
     return render_template('dashboard.html', 
                          user_count=user_count,
@@ -263,6 +313,7 @@ def dashboard():
 
 @app.route('/strength-tester')
 @login_required
+@response_cache.cached()
 def strength_tester():
     return render_template('strength_tester.html')
 
@@ -273,8 +324,19 @@ def admin_panel():
         flash('ERROR: Insufficient clearance level.', 'error')
         return redirect(url_for('dashboard'))
     
-    users = User.query.all()
-    return render_template('admin_panel.html', users=users)
+    search = request.args.get('q', '').strip()
+    role = request.args.get('role') if request.args.get('role') in ('admin', 'user') else None
+    users, next_cursor = list_users(
+        User,
+        cursor=request.args.get('after'),
+        search=search or None,
+        role=role,
+        per_page=app.config['ADMIN_USERS_PER_PAGE']
+    )
+    total_users, admin_count, _ = user_stats.snapshot()
+    return render_template('admin_panel.html', users=users, next_cursor=next_cursor,
+                           search=search, role=role, total_users=total_users,
+                           admin_count=admin_count)
 
 @app.route('/logout')
 @login_required
@@ -293,12 +355,96 @@ def check_password():
     if not password:
         return jsonify({'error': 'No password provided'}), 400
     
-    meter = PasswordStrengthMeter()
-    result = meter.calculate_strength(password)
+    result = strength_cache.calculate_strength(password)
     return jsonify(result)
 
+@app.route('/api/check-password/batch', methods=['POST'])
+@login_required
+def check_password_batch():
+    """Score a list of passwords in one call (admin audits and bulk provisioning)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Insufficient clearance level'}), 403
+    
+    data = request.get_json(silent=True) or {}
+    passwords = data.get('passwords')
+    
+    if not isinstance(passwords, list) or not passwords:
+        return jsonify({'error': 'No passwords provided'}), 400
+    
+    if not all(isinstance(password, str) for password in passwords):
+        return jsonify({'error': 'Passwords must be strings'}), 400
+    
+    limit = app.config['PASSWORD_BATCH_LIMIT']
+    if len(passwords) > limit:
+        return jsonify({'error': f'Batch limited to {limit} passwords'}), 413
+    
+    max_length = app.config['PASSWORD_MAX_LENGTH']
+    if any(len(password) > max_length for password in passwords):
+        return jsonify({'error': f'Passwords limited to {max_length} characters'}), 413
+    
+    results = strength_meter.calculate_strength_many(passwords)
+    return jsonify({'count': len(results), 'results': results})
+
+@app.route('/api/admin/reload-corpus', methods=['POST'])
+@login_required
+def reload_corpus():
+    """Swap in a rebuilt common-password index without restarting the worker"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Insufficient clearance level'}), 403
+    
+    try:
+        corpus = strength_meter.reload_corpus()
+    except (OSError, ValueError) as e:
+        return jsonify({'error': f'Corpus reload failed: {e}'}), 500
+    strength_cache.clear()
+    
+    return jsonify({
+        'status': 'RELOADED',
+        'entries': len(corpus) if corpus is not None else 0
+    })
+
+@app.route('/api/admin/strength-cache')
+@login_required
+def strength_cache_stats():
+    """Hit/miss counters for the password strength cache"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Insufficient clearance level'}), 403
+    return jsonify(strength_cache.stats())
+
+@app.route('/api/admin/response-cache', methods=['GET', 'DELETE'])
+@login_required
+def response_cache_admin():
+    """Response cache counters; DELETE drops every cached page (?endpoint= for one)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Insufficient clearance level'}), 403
+    if request.method == 'DELETE':
+        endpoints = request.args.getlist('endpoint')
+        return jsonify({'status': 'INVALIDATED', 'removed': response_cache.invalidate(*endpoints)})
+    return jsonify(response_cache.stats())
+
+@app.route('/api/admin/revoke-sessions/<int:user_id>', methods=['POST'])
+@login_required
+def revoke_sessions(user_id):
+    """Log a user out everywhere"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Insufficient clearance level'}), 403
+    return jsonify({'user_id': user_id, 'revoked': SessionSecurity.revoke_user_sessions(user_id)})
+
+@app.route('/api/admin/export-users')
+@login_required
+def export_users():
+    """Stream every user as CSV or NDJSON (?format=csv|ndjson)"""
+    if not current_user.is_admin():
+        return jsonify({'error': 'Insufficient clearance level'}), 403
+    
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': 'Format must be csv or ndjson'}), 400
+    return export_users_response(User, fmt, batch_size=app.config['EXPORT_BATCH_SIZE'])
+
 @app.route('/pipboy-radio')
 @login_required
+@response_cache.cached()
 def pipboy_radio():
     """Pip-Boy radio station (Easter egg)"""
     stations = [
@@ -317,7 +463,7 @@ def system_status():
         'database': {
             'status': 'OPERATIONAL',
             'color': '#00FF00',
-            'details': f'{User.query.count()} users registered'
+            'details': f'{user_stats.user_count()} users registered'
         },
         'security': {
             'status': 'ACTIVE',
@@ -332,7 +478,7 @@ def system_status():
         'encryption': {
             'status': 'ENABLED',
             'color': '#00FF00',
-            'details': 'PBKDF2-SHA256 260k iterations'
+            'details': 'PBKDF2-SHA256 600k iterations'
         }
     }
     return render_template('system_status.html', status_info=status_info)
@@ -348,6 +494,7 @@ def geiger_click():
     })
 
 @app.route('/force-css')
+@response_cache.cached(shared=True)
 def force_css():
     return '''
     <style>
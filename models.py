@@ -1,15 +1,22 @@
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from hash_pool import hash_pool
+from password_hashing import hashing_policy
+from last_login import last_login_buffer
+from db_routing import RoutingSession
 
 # Initialize db here OR import it from a common extensions file
 # To avoid circular imports, don't import 'app' here.
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(UserMixin, db.Model):
     """Secure User model for Vault-Tec Applications"""
     __tablename__ = 'users'
+    __table_args__ = (
+        # Keyset pagination for the admin user listing
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
@@ -24,16 +31,12 @@ class User(UserMixin, db.Model):
         return f'<User {self.username}>'
     
     def set_password(self, password):
-        """Hash and set password using modern PBKDF2"""
-        self.password_hash = generate_password_hash(
-            password,
-            method='pbkdf2:sha256',
-            salt_length=16
-        )
+        """Hash and set password under the current hashing policy"""
+        self.password_hash = hashing_policy.hash(password)
     
     def check_password(self, password):
-        """Verify password against stored hash"""
-        return check_password_hash(self.password_hash, password)
+        """Verify password against stored hash, upgrading it if the hashing policy changed"""
+        return hashing_policy.verify(self, password, pool=hash_pool)
     
     @property
     def is_admin(self):
@@ -41,9 +44,11 @@ class User(UserMixin, db.Model):
         return self.role == 'admin'
     
     def update_last_login(self):
-        """Update last login timestamp and commit to DB"""
-        self.last_login = datetime.utcnow()
-        db.session.commit()
+        """Record the login time (written in batches) and commit any upgraded password hash"""
+        if not last_login_buffer.record(self.id):
+            self.last_login = datetime.utcnow()
+        if db.session.is_modified(self):
+            db.session.commit()
     
     def to_dict(self):
         """Convert user object to dictionary for API use"""
@@ -55,4 +60,50 @@ class User(UserMixin, db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'last_login': self.last_login.isoformat() if self.last_login else None,
             'is_active': self.is_active_user
-        }
\ No newline at end of file
+        }
+
+class LoginAttempt(db.Model):
+    """Login attempts for rate-limit auditing; pruned by retention.py"""
+    __tablename__ = 'login_attempts'
+    __table_args__ = (
+        # Failed attempts per user in a time window (rate limit, failure counts)
+        db.Index('ix_login_attempts_user_success_time', 'username', 'success', 'attempt_time'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), nullable=False)
+    ip_address = db.Column(db.String(45), nullable=True)
+    success = db.Column(db.Boolean, default=False, nullable=False)
+    user_agent = db.Column(db.String(200), nullable=True)
+    attempt_time = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<LoginAttempt {self.username} {"OK" if self.success else "FAIL"}>'
+
+
+class SecurityLog(db.Model):
+    """Security events; rolled up into SecurityLogDaily by retention.py"""
+    __tablename__ = 'security_logs'
+    __table_args__ = (
+        # Reporting by event type over a time range
+        db.Index('ix_security_logs_type_created', 'event_type', 'created'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    username = db.Column(db.String(80), nullable=True)
+    ip_address = db.Column(db.String(45), nullable=True)
+    details = db.Column(db.Text, nullable=True)
+    created = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    def __repr__(self):
+        return f'<SecurityLog {self.event_type}>'
+
+
+class SecurityLogDaily(db.Model):
+    """Per-day event counts kept after the detailed SecurityLog rows are pruned"""
+    __tablename__ = 'security_logs_daily'
+    
+    day = db.Column(db.Date, primary_key=True)
+    event_type = db.Column(db.String(50), primary_key=True)
+    count = db.Column(db.Integer, default=0, nullable=False)
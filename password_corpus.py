@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Common-password corpus index for the Vault-Tec password strength meter
+
+The index is a sorted array of 64-bit BLAKE2b digests of lowercased
+passwords behind a small header. Workers mmap it read-only, so the pages
+are shared between processes and lookups are a binary search.
+
+Build an index from a breach list (one password per line):
+    python password_corpus.py build breach.txt common_passwords.idx
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # Builds fall back to sorting in pure Python
+    np = None
+
+MAGIC = b'VTPI'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sIQ')  # magic, version, entry count
+_ENTRY = struct.Struct('<Q')
+
+
+def password_digest(password):
+    """64-bit digest of a password, as stored in the index"""
+    data = password.lower().encode('utf-8', 'surrogatepass')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+class CommonPasswordIndex:
+    """Read-only, memory-mapped set of common password digests"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            try:
+                magic, version, count = _HEADER.unpack_from(self._map, 0)
+            except struct.error:
+                raise ValueError(f'{path} is truncated') from None
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'{path} is not a common-password index')
+            if len(self._map) != _HEADER.size + count * _ENTRY.size:
+                raise ValueError(f'{path} is truncated')
+        except BaseException:
+            self._map.close()
+            raise
+
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, password):
+        """Binary search for the password digest (case-insensitive)"""
+        target = password_digest(password)
+        buffer = self._map
+        unpack = _ENTRY.unpack_from
+        offset = _HEADER.size
+        low, high = 0, self._count
+
+        while low < high:
+            middle = (low + high) // 2
+            value = unpack(buffer, offset + middle * _ENTRY.size)[0]
+            if value < target:
+                low = middle + 1
+            elif value > target:
+                high = middle
+            else:
+                return True
+
+        return False
+
+    def close(self):
+        """Release the memory map"""
+        self._map.close()
+
+
+def open_index(path):
+    """Open the index at path, or return None when it is not configured or built"""
+    if not path or not os.path.exists(path):
+        return None
+    return CommonPasswordIndex(path)
+
+
+def build_index(source_path, index_path):
+    """Hash, sort and deduplicate a breach list into an index file.
+
+    The file is written next to the target and renamed into place, so
+    workers that already have the old index mapped keep a valid view.
+    Returns the number of distinct entries.
+    """
+    digests = array('Q')
+    with open(source_path, 'rb') as source:
+        for line in source:
+            password = line.rstrip(b'\r\n').decode('utf-8', 'replace')
+            if password:
+                digests.append(password_digest(password))
+
+    if np is not None:
+        values = np.unique(np.frombuffer(digests, dtype=np.uint64))
+        count = len(values)
+        entries = values.astype('<u8').tobytes()
+    else:
+        values = array('Q', sorted(set(digests)))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        count = len(values)
+        entries = values.tobytes()
+    del digests
+
+    temp_path = f'{index_path}.tmp'
+    with open(temp_path, 'wb') as target:
+        target.write(_HEADER.pack(MAGIC, VERSION, count))
+        target.write(entries)
+    os.replace(temp_path, index_path)
+
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Vault-Tec common-password index tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='precompute an index from a password list')
+    build.add_argument('source', help='text file with one password per line')
+    build.add_argument('index', nargs='?', default='common_passwords.idx', help='index file to write')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        print(f"Building common-password index from {args.source}...")
+        count = build_index(args.source, args.index)
+        size_mb = os.path.getsize(args.index) / (1024 * 1024)
+        print(f"✓ Wrote {count} entries to {args.index} ({size_mb:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
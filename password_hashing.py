@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Password hashing policy for the Vault-Tec Secure System
+
+The policy turns HASH_METHOD, HASH_ITERATIONS and HASH_SALT_LENGTH (plus
+HASH_SCRYPT_* for scrypt) into a werkzeug method string. Stored hashes
+made with another algorithm, or a lower cost or shorter salt, are
+upgraded on the next successful login; stronger ones are left alone.
+
+Find a cost that takes about 250 ms on this machine:
+    python password_hashing.py calibrate --method pbkdf2:sha256 --target-ms 250
+"""
+
+import argparse
+import hashlib
+import os
+import time
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from config import Config
+from hash_pool import HashPoolSaturated
+
+
+class HashingPolicy:
+    """Current hashing method and cost for new and upgraded password hashes"""
+
+    def __init__(self, app=None):
+        self.configure(
+            method=Config.HASH_METHOD,
+            iterations=Config.HASH_ITERATIONS,
+            salt_length=Config.HASH_SALT_LENGTH,
+            scrypt_n=Config.HASH_SCRYPT_N,
+            scrypt_r=Config.HASH_SCRYPT_R,
+            scrypt_p=Config.HASH_SCRYPT_P
+        )
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the policy from the app config, falling back to Config defaults"""
+        self.configure(
+            method=app.config.get('HASH_METHOD', Config.HASH_METHOD),
+            iterations=app.config.get('HASH_ITERATIONS', Config.HASH_ITERATIONS),
+            salt_length=app.config.get('HASH_SALT_LENGTH', Config.HASH_SALT_LENGTH),
+            scrypt_n=app.config.get('HASH_SCRYPT_N', Config.HASH_SCRYPT_N),
+            scrypt_r=app.config.get('HASH_SCRYPT_R', Config.HASH_SCRYPT_R),
+            scrypt_p=app.config.get('HASH_SCRYPT_P', Config.HASH_SCRYPT_P)
+        )
+        app.extensions['hashing_policy'] = self
+
+    def configure(self, method, iterations, salt_length, scrypt_n, scrypt_r, scrypt_p):
+        name = method.split(':', 1)[0]
+        if name == 'pbkdf2':
+            digest = method.split(':')[1] if ':' in method else 'sha256'
+            self.method = f'pbkdf2:{digest}:{iterations}'
+        elif name == 'scrypt':
+            self.method = f'scrypt:{scrypt_n}:{scrypt_r}:{scrypt_p}'
+        else:
+            raise ValueError(f'Unsupported HASH_METHOD: {method}')
+        self.salt_length = salt_length
+
+    def hash(self, password, pool=None):
+        """Hash a password under this policy, in the given hash pool if any"""
+        if pool is not None:
+            return pool.generate_password_hash(password, self.method, self.salt_length)
+        return generate_password_hash(password, method=self.method, salt_length=self.salt_length)
+
+    def needs_rehash(self, pwhash):
+        """True when a stored hash uses another algorithm, or a lower cost or shorter salt.
+
+        A hash stronger than the policy (e.g. werkzeug's own 600k-iteration
+        default against a lower HASH_ITERATIONS) is never rehashed, since
+        that would weaken it.
+        """
+        method, _, rest = pwhash.partition('$')
+        salt = rest.partition('$')[0]
+        stored = _parse_method(method)
+        current = _parse_method(self.method)
+        if stored is None or stored[0] != current[0]:
+            return True
+        stored_cost, current_cost = stored[1], current[1]
+        if any(s > c for s, c in zip(stored_cost, current_cost)):
+            return False
+        return stored_cost != current_cost or len(salt) < self.salt_length
+
+    def verify(self, user, password, pool=None):
+        """Check password against user.password_hash, upgrading an outdated hash.
+        
+        The upgraded hash is only assigned; the caller's next commit stores
+        it. If the pool is saturated the upgrade waits for a later login.
+        """
+        if pool is not None:
+            valid = pool.check_password_hash(user.password_hash, password)
+        else:
+            valid = check_password_hash(user.password_hash, password)
+        if not valid:
+            return False
+
+        if self.needs_rehash(user.password_hash):
+            try:
+                user.password_hash = self.hash(password, pool=pool)
+            except HashPoolSaturated:
+                pass
+
+        return True
+
+
+# Shared instance, bound to an app with hashing_policy.init_app(app)
+hashing_policy = HashingPolicy()
+
+
+def _parse_method(method):
+    """Split a werkzeug method string into (algorithm, cost tuple), or None.
+
+    Missing parameters take werkzeug's defaults, the values it verifies
+    such hashes with.
+    """
+    parts = method.split(':')
+    try:
+        if parts[0] == 'pbkdf2':
+            digest = parts[1] if len(parts) > 1 else 'sha256'
+            iterations = int(parts[2]) if len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+            return f'pbkdf2:{digest}', (iterations,)
+        if parts[0] == 'scrypt':
+            n, r, p = (int(x) for x in parts[1:4]) if len(parts) > 1 else (2 ** 15, 8, 1)
+            return 'scrypt', (n, r, p)
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
+def calibrate(method='pbkdf2:sha256', target_ms=250):
+    """Cost parameter whose hash takes about target_ms on this machine.
+
+    Returns the PBKDF2 iteration count, or the scrypt N (a power of two).
+    """
+    salt = os.urandom(16)
+    name = method.split(':', 1)[0]
+
+    if name == 'pbkdf2':
+        digest = method.split(':')[1] if ':' in method else 'sha256'
+        probe = 50000
+        start = time.perf_counter()
+        hashlib.pbkdf2_hmac(digest, b'vault-tec-calibration', salt, probe)
+        elapsed = time.perf_counter() - start
+        # Round to the nearest thousand iterations
+        return max(1000, int(round(probe * (target_ms / 1000) / elapsed, -3)))
+
+    if name == 'scrypt':
+        n = 2 ** 14
+        while n < 2 ** 20:
+            start = time.perf_counter()
+            hashlib.scrypt(b'vault-tec-calibration', salt=salt, n=n, r=8, p=1, maxmem=132 * n * 8)
+            if (time.perf_counter() - start) * 1000 >= target_ms:
+                break
+            n *= 2
+        return n
+
+    raise ValueError(f'Unsupported HASH_METHOD: {method}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Vault-Tec password hashing tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    calibrate_cmd = commands.add_parser('calibrate', help='find a hash cost for a target latency')
+    calibrate_cmd.add_argument('--method', default=Config.HASH_METHOD, help='pbkdf2:sha256 or scrypt')
+    calibrate_cmd.add_argument('--target-ms', type=int, default=250, help='target time per hash')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'calibrate':
+        cost = calibrate(args.method, args.target_ms)
+        print(f"// Calibrated for ~{args.target_ms} ms per hash //")
+        print(f"HASH_METHOD = '{args.method}'")
+        if args.method.startswith('scrypt'):
+            print(f"HASH_SCRYPT_N = {cost}")
+        else:
+            print(f"HASH_ITERATIONS = {cost}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,302 @@
-import re
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
+try:
+    import numpy as np
+except ImportError:  # Batch scoring falls back to the per-password scanner
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Character class bits produced by the scanner
+_UPPER = 1
+_LOWER = 2
+_DIGIT = 4
+_SPECIAL = 8    # one of the symbols rewarded by calculate_strength
+_SYMBOL = 16    # anything outside [a-zA-Z0-9], used for entropy
+
+_SPECIAL_CHARS = '!@#$%^&*(),.?":{}|<>'
+
+_KEYBOARD_ROWS = ('qwertyuiop', 'asdfghjkl', 'zxcvbnm', '1234567890')
+
+
+def _build_char_classes():
+    """Class bits for every ASCII character"""
+    classes = {}
+    for code in range(128):
+        ch = chr(code)
+        if 'A' <= ch <= 'Z':
+            bits = _UPPER
+        elif 'a' <= ch <= 'z':
+            bits = _LOWER
+        elif '0' <= ch <= '9':
+            bits = _DIGIT
+        else:
+            bits = _SYMBOL
+            if ch in _SPECIAL_CHARS:
+                bits |= _SPECIAL
+        classes[ch] = bits
+    return classes
+
+
+def _build_key_positions():
+    """Map keys to positions; rows are spaced so a step of +/-1 never crosses rows"""
+    positions = {}
+    for row_index, row in enumerate(_KEYBOARD_ROWS):
+        for column, key in enumerate(row):
+            positions[key] = positions[key.upper()] = row_index * 16 + column
+    return positions
+
+
+_CHAR_CLASSES = _build_char_classes()
+_KEY_POSITIONS = _build_key_positions()
+
+
+def _scan(password):
+    """Classify characters and detect repeats, digit runs and keyboard walks in one pass.
+
+    Returns (class_bits, has_repeat, has_digit_run, has_keyboard_walk).
+    """
+    classes = 0
+    repeated = digit_run = keyboard = False
+    prev_char = None
+    run = digits = 0
+    prev_key = None
+    step = 0
+
+    for ch in password:
+        bits = _CHAR_CLASSES.get(ch)
+        if bits is None:
+            # Non-ASCII: \d matches any Unicode decimal digit
+            bits = _DIGIT | _SYMBOL if ch.isdecimal() else _SYMBOL
+        classes |= bits
+
+        # Same character three times in a row, as (.)\1{2,}
+        if ch == prev_char:
+            run += 1
+            if run >= 3 and ch != '\n':
+                repeated = True
+        else:
+            run = 1
+            prev_char = ch
+
+        # Four digits in a row, as \d{4}
+        if bits & _DIGIT:
+            digits += 1
+            if digits >= 4:
+                digit_run = True
+        else:
+            digits = 0
+
+        # Three adjacent keys in the same direction along a keyboard row
+        key = _KEY_POSITIONS.get(ch)
+        if key is not None and prev_key is not None:
+            delta = key - prev_key
+            if delta == 1 or delta == -1:
+                if delta == step:
+                    keyboard = True
+                step = delta
+            else:
+                step = 0
+        else:
+            step = 0
+        prev_key = key
+
+    return classes, repeated, digit_run, keyboard
+
+
+if np is not None:
+    _CLASS_TABLE = np.array([_CHAR_CLASSES[chr(code)] for code in range(128)], dtype=np.uint8)
+    _NO_KEY = -64   # far enough from every key position that no step is +/-1
+    _KEY_TABLE = np.array(
+        [_KEY_POSITIONS.get(chr(code), _NO_KEY) for code in range(128)], dtype=np.int16
+    )
+
+# Passwords encoded per block in calculate_strength_many; bounds the padded matrix size
+_BATCH_BLOCK = 1024
+
+# Each block is a block x longest-password matrix (plus temporaries of the
+# same shape), so longer passwords are scanned one at a time instead
+_BATCH_MAX_LENGTH = 256
+
+
+def _scan_batch(passwords):
+    """Vectorized _scan over a list of passwords.
+
+    Returns (scans, unique_counts) with one entry per password.
+    """
+    count = len(passwords)
+    text = np.array(passwords, dtype=str)
+    width = text.itemsize // 4
+    codes = text.view(np.uint32).reshape(count, width).astype(np.int64)
+    lengths = np.fromiter(map(len, passwords), dtype=np.int64, count=count)
+    valid = np.arange(width) < lengths[:, None]
+    codes[~valid] = -1
+
+    # Character classes from the ASCII table, Unicode digits looked up once per code point
+    is_ascii = valid & (codes < 128)
+    ascii_codes = np.where(is_ascii, codes, 0)
+    bits = np.where(is_ascii, _CLASS_TABLE[ascii_codes], 0).astype(np.uint8)
+    wide = codes >= 128
+    if wide.any():
+        wide_codes = np.unique(codes[wide])
+        wide_bits = np.array(
+            [_DIGIT | _SYMBOL if chr(code).isdecimal() else _SYMBOL for code in wide_codes.tolist()],
+            dtype=np.uint8
+        )
+        bits[wide] = wide_bits[np.searchsorted(wide_codes, codes[wide])]
+    classes = np.bitwise_or.reduce(bits, axis=1)
+
+    # Same character three times in a row, newline excluded
+    same = (codes[:, 1:] == codes[:, :-1]) & valid[:, 1:]
+    repeated = (same[:, 1:] & same[:, :-1] & (codes[:, 2:] != 10)).any(axis=1)
+
+    # Four digits in a row
+    digit = (bits & _DIGIT) != 0
+    digit_run = (digit[:, 3:] & digit[:, 2:-1] & digit[:, 1:-2] & digit[:, :-3]).any(axis=1)
+
+    # Two equal +/-1 steps along a keyboard row
+    keys = np.where(is_ascii, _KEY_TABLE[ascii_codes], _NO_KEY)
+    step = np.diff(keys, axis=1)
+    single = (step == 1) | (step == -1)
+    keyboard = (single[:, 1:] & (step[:, 1:] == step[:, :-1])).any(axis=1)
+
+    # Distinct code points per row; the -1 padding counts as one extra value
+    ordered = np.sort(codes, axis=1)
+    distinct = (ordered[:, 1:] != ordered[:, :-1]).sum(axis=1) + 1
+    unique = distinct - (lengths < width)
+
+    scans = list(zip(classes.tolist(), repeated.tolist(), digit_run.tolist(), keyboard.tolist()))
+    return scans, unique.tolist()
+
+
+def _stamp():
+    """Timestamp and scan ID attached to each result"""
+    now = datetime.now()
+    return now.strftime("%Y-%m-%d %H:%M:%S"), f"SCAN-{now.timestamp():.0f}"
+
+
+def _entropy_bits(length, classes):
+    """Approximate entropy bits from the password length and class bits"""
+    charset_size = 0
+    if classes & _LOWER:
+        charset_size += 26
+    if classes & _UPPER:
+        charset_size += 26
+    if classes & _DIGIT:
+        charset_size += 10
+    if classes & _SYMBOL:
+        charset_size += 32  # Approximate for special chars
+
+    if charset_size == 0:
+        return 0
+
+    return length * charset_size.bit_length()
+
+
+# Marks a corpus that has a loader but has not been loaded yet
+_UNLOADED = object()
+
+
 class PasswordStrengthMeter:
-    def __init__(self):
-        self.common_passwords = [
+    """Stateless scorer; one instance can be shared by every request thread"""
+    
+    def __init__(self, corpus=None, corpus_loader=None):
+        self.common_passwords = frozenset([
             'password', '123456', '12345678', '123456789', '12345',
             'qwerty', 'abc123', 'password1', 'admin', 'letmein',
             'welcome', 'monkey', 'dragon', 'football', 'baseball',
             'hello', 'master', 'sunshine', 'trustno1', 'superman'
-        ]
+        ])
+        # Optional breach corpus, e.g. a password_corpus.CommonPasswordIndex,
+        # given directly or by a loader that runs on first use
+        self._corpus_loader = corpus_loader
+        self._corpus = _UNLOADED if corpus_loader is not None and corpus is None else corpus
+        self._corpus_lock = threading.Lock()
+    
+    @property
+    def corpus(self):
+        """Breach corpus, loading it on first access.
+
+        A corpus that fails to load is logged once and treated as absent,
+        so scoring carries on with the built-in list; reload_corpus() can
+        try again.
+        """
+        corpus = self._corpus
+        if corpus is _UNLOADED:
+            with self._corpus_lock:
+                if self._corpus is _UNLOADED:
+                    try:
+                        self._corpus = self._corpus_loader()
+                    except (OSError, ValueError) as e:
+                        logger.error('Common-password corpus unavailable, using the built-in list: %s', e)
+                        self._corpus = None
+                corpus = self._corpus
+        return corpus
+    
+    def reload_corpus(self, corpus_loader=None):
+        """Load a fresh corpus and swap it in.
+        
+        Checks already running keep the corpus they started with; the old
+        one is released once nothing references it.
+        """
+        with self._corpus_lock:
+            if corpus_loader is not None:
+                self._corpus_loader = corpus_loader
+            if self._corpus_loader is None:
+                raise ValueError('No corpus loader configured')
+            self._corpus = self._corpus_loader()
+            return self._corpus
+    
+    def is_common(self, password_lower):
+        """Check the built-in list, then the breach corpus if one is loaded"""
+        if password_lower in self.common_passwords:
+            return True
+        corpus = self.corpus
+        return corpus is not None and password_lower in corpus
     
     def calculate_strength(self, password):
         """Calculate password strength with detailed feedback"""
+        return self._score(password, _scan(password), len(set(password)), _stamp())
+    
+    def calculate_strength_many(self, passwords):
+        """Calculate strength for a batch of passwords in one call"""
+        passwords = list(passwords)
+        stamp = _stamp()
+        
+        if np is None:
+            scans = [_scan(password) for password in passwords]
+            unique_counts = [len(set(password)) for password in passwords]
+        else:
+            scans = [None] * len(passwords)
+            unique_counts = [None] * len(passwords)
+            short = []
+            for i, password in enumerate(passwords):
+                if len(password) > _BATCH_MAX_LENGTH:
+                    scans[i] = _scan(password)
+                    unique_counts[i] = len(set(password))
+                else:
+                    short.append(i)
+            for start in range(0, len(short), _BATCH_BLOCK):
+                block = short[start:start + _BATCH_BLOCK]
+                block_scans, block_unique = _scan_batch([passwords[i] for i in block])
+                for i, scan, unique_chars in zip(block, block_scans, block_unique):
+                    scans[i] = scan
+                    unique_counts[i] = unique_chars
+        
+        return [
+            self._score(password, scan, unique_chars, stamp)
+            for password, scan, unique_chars in zip(passwords, scans, unique_counts)
+        ]
+    
+    def _score(self, password, scan, unique_chars, stamp):
+        """Build the strength result from a completed scan"""
+        classes, repeated, digit_run, keyboard = scan
         score = 0
         feedback = []
         
@@ -29,10 +314,10 @@ class PasswordStrengthMeter:
             feedback.append("INSUFFICIENT LENGTH: Minimum 8 characters required")
         
         # Character variety checks
-        has_upper = re.search(r'[A-Z]', password)
-        has_lower = re.search(r'[a-z]', password)
-        has_digit = re.search(r'\d', password)
-        has_special = re.search(r'[!@#$%^&*(),.?":{}|<>]', password)
+        has_upper = bool(classes & _UPPER)
+        has_lower = bool(classes & _LOWER)
+        has_digit = bool(classes & _DIGIT)
+        has_special = bool(classes & _SPECIAL)
         
         if has_upper:
             score += 15
@@ -55,7 +340,7 @@ class PasswordStrengthMeter:
             feedback.append("SPECIAL CHARACTERS advised for maximum security")
         
         # Character variety bonus
-        char_types = sum([has_upper, has_lower, has_digit, has_special])
+        char_types = has_upper + has_lower + has_digit + has_special
         if char_types >= 3:
             score += 10
         if char_types == 4:
@@ -63,27 +348,29 @@ class PasswordStrengthMeter:
         
         # Dictionary and common password check
         password_lower = password.lower()
-        if password_lower in self.common_passwords:
+        if self.is_common(password_lower):
             score = max(10, score - 40)
             feedback.insert(0, "CRITICAL: Common password detected - HIGH RISK")
         
-        # Check for keyboard patterns
-        if self.has_keyboard_pattern(password_lower):
+        # Check for keyboard patterns; lowercasing non-ASCII text can
+        # produce ASCII letters, so rescan the lowered form in that case
+        if not password.isascii():
+            keyboard = _scan(password_lower)[3]
+        if keyboard:
             score -= 15
             feedback.append("Keyboard pattern detected - avoid sequential keys")
         
         # Check for repeated characters
-        if self.has_repeated_chars(password):
+        if repeated:
             score -= 10
             feedback.append("Repeated character patterns reduce security")
         
         # Check for personal info patterns (simplified)
-        if re.search(r'\d{4}', password):  # Likely year
+        if digit_run:  # Likely year
             score -= 5
             feedback.append("Avoid using years in passwords")
         
         # Entropy calculation (simplified)
-        unique_chars = len(set(password))
         score += min(20, unique_chars * 2)
         
         # Final score clamping
@@ -111,9 +398,8 @@ class PasswordStrengthMeter:
             color = "#FF3300"
             status = "IMMEDIATE ACTION REQUIRED"
         
-        # Generate timestamp and scan ID
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        scan_id = f"SCAN-{datetime.now().timestamp():.0f}"
+        # Timestamp and scan ID
+        timestamp, scan_id = stamp
         
         # If no specific feedback, provide positive reinforcement
         if not feedback and score >= 70:
@@ -130,37 +416,25 @@ class PasswordStrengthMeter:
             'timestamp': timestamp,
             'scan_id': scan_id,
             'length': length,
-            'has_upper': bool(has_upper),
-            'has_lower': bool(has_lower),
-            'has_digit': bool(has_digit),
-            'has_special': bool(has_special),
+            'has_upper': has_upper,
+            'has_lower': has_lower,
+            'has_digit': has_digit,
+            'has_special': has_special,
             'unique_chars': unique_chars
         }
     
     def has_keyboard_pattern(self, password):
         """Check for keyboard sequential patterns"""
-        keyboard_rows = [
-            'qwertyuiop',
-            'asdfghjkl',
-            'zxcvbnm',
-            '1234567890'
-        ]
-        
-        for row in keyboard_rows:
-            for i in range(len(row) - 2):
-                sequence = row[i:i+3]
-                if sequence in password or sequence[::-1] in password:
-                    return True
-        
-        return False
+        return _scan(password)[3]
     
     def has_repeated_chars(self, password):
         """Check for repeated character patterns"""
-        return bool(re.search(r'(.)\1{2,}', password))
+        return _scan(password)[1]
     
     def get_detailed_analysis(self, password):
         """Get detailed password analysis"""
-        strength = self.calculate_strength(password)
+        scan = _scan(password)
+        strength = self._score(password, scan, len(set(password)), _stamp())
         
         # Add time to crack estimates (simplified)
         if strength['score'] >= 85:
@@ -175,27 +449,13 @@ class PasswordStrengthMeter:
             time_to_crack = "SECONDS"
         
         strength['time_to_crack'] = time_to_crack
-        strength['entropy_bits'] = self.calculate_entropy(password)
+        strength['entropy_bits'] = _entropy_bits(len(password), scan[0])
         
         return strength
     
     def calculate_entropy(self, password):
         """Calculate approximate entropy bits"""
-        charset_size = 0
-        if re.search(r'[a-z]', password):
-            charset_size += 26
-        if re.search(r'[A-Z]', password):
-            charset_size += 26
-        if re.search(r'\d', password):
-            charset_size += 10
-        if re.search(r'[^a-zA-Z0-9]', password):
-            charset_size += 32  # Approximate for special chars
-        
-        if charset_size == 0:
-            return 0
-        
-        entropy_per_char = charset_size.bit_length()
-        return len(password) * entropy_per_char
+        return _entropy_bits(len(password), _scan(password)[0])
     
     def generate_strong_password(self, length=16):
         """Generate a strong password (optional feature)"""
@@ -206,4 +466,79 @@ class PasswordStrengthMeter:
         while True:
             password = ''.join(random.choice(characters) for _ in range(length))
             if self.calculate_strength(password)['score'] >= 85:
-                return password
\ No newline at end of file
+                return password
+
+
+class StrengthResultCache:
+    """Bounded LRU/TTL cache in front of PasswordStrengthMeter.calculate_strength.
+    
+    Entries are keyed by a BLAKE2b digest under a per-process random key, so
+    plaintext passwords are never stored. Hits get a fresh timestamp and scan ID.
+    """
+    
+    def __init__(self, meter, max_entries=4096, ttl=300):
+        self.meter = meter
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _digest(self, password):
+        data = password.encode('utf-8', 'surrogatepass')
+        return hashlib.blake2b(data, key=self._key, digest_size=16).digest()
+    
+    def calculate_strength(self, password):
+        """Cached calculate_strength; the returned dict is the caller's to modify"""
+        if self.max_entries <= 0:
+            return self.meter.calculate_strength(password)
+        
+        digest = self._digest(password)
+        now = time.monotonic()
+        
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None and entry[0] <= now:
+                del self._entries[digest]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+            else:
+                self.misses += 1
+        
+        if entry is not None:
+            cached = entry[1]
+            timestamp, scan_id = _stamp()
+            return dict(cached, feedback=list(cached['feedback']), timestamp=timestamp, scan_id=scan_id)
+        
+        result = self.meter.calculate_strength(password)
+        cached = dict(result, feedback=list(result['feedback']))
+        
+        with self._lock:
+            self._entries[digest] = (now + self.ttl, cached)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        
+        return result
+    
+    def clear(self):
+        """Drop every entry, e.g. after the corpus has been reloaded"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl
+            }
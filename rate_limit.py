@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Per-process sliding-window log.
+
+    A key keeps only its newest `limit` timestamps. That is enough to tell
+    whether `limit` events fall inside the window, so each check is O(1).
+    The least recently used keys are evicted past `max_keys`, which keeps
+    memory bounded under random-username floods.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key, limit, window):
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(key)
+            if events is None or events.maxlen != limit:
+                events = deque(events or (), maxlen=limit)
+                self._events[key] = events
+            events.append(now)
+            self._events.move_to_end(key)
+            while len(self._events) > self.max_keys:
+                self._events.popitem(last=False)
+
+    def count(self, key, limit, window):
+        cutoff = time.monotonic() - window
+        with self._lock:
+            events = self._events.get(key)
+            if not events:
+                return 0
+            return sum(1 for stamp in events if stamp > cutoff)
+
+    def reset(self, key):
+        with self._lock:
+            self._events.pop(key, None)
+
+
+class RedisBackend:
+    """Sliding-window log shared by every worker, one sorted set per key.
+
+    Works with a redis-py client or any stand-in that implements pipeline,
+    zadd, zremrangebyscore, zcount, expire and delete.
+    """
+
+    def __init__(self, client, prefix='vt:ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url):
+        import redis  # Only needed when a shared backend is configured
+        return cls(redis.Redis.from_url(url))
+
+    def add(self, key, limit, window):
+        now = time.time()
+        name = self.prefix + key
+        pipe = self.client.pipeline()
+        pipe.zadd(name, {f'{now:.6f}:{os.urandom(4).hex()}': now})
+        pipe.zremrangebyscore(name, 0, now - window)
+        pipe.expire(name, int(window) + 1)
+        pipe.execute()
+
+    def count(self, key, limit, window):
+        now = time.time()
+        return self.client.zcount(self.prefix + key, now - window, '+inf')
+
+    def reset(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class LoginRateLimiter:
+    """Failed-login limits per username and per client address.
+
+    Backend errors (e.g. Redis being unreachable) are logged and the
+    limiter fails open, so an outage of the shared store doesn't stop
+    logins.
+    """
+
+    def __init__(self, backend=None, max_attempts=5, window=300, max_attempts_per_ip=20):
+        self.backend = backend or MemoryBackend()
+        self.max_attempts = max_attempts
+        self.window = window
+        self.max_attempts_per_ip = max_attempts_per_ip
+
+    def init_app(self, app):
+        """Configure limits and backend from the app config"""
+        self.max_attempts = app.config.get('MAX_LOGIN_ATTEMPTS', self.max_attempts)
+        self.window = app.config.get('LOCKOUT_TIME', self.window)
+        self.max_attempts_per_ip = app.config.get('MAX_LOGIN_ATTEMPTS_PER_IP', self.max_attempts_per_ip)
+
+        backend_url = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend_url and backend_url != 'memory':
+            self.backend = RedisBackend.from_url(backend_url)
+        app.extensions['login_rate_limiter'] = self
+
+    def is_limited(self, username, ip_address=None, max_attempts=None, window=None):
+        """True when the username or the address has too many recent failures.
+
+        Overrides can tighten the configured limits but not loosen them:
+        only the newest max_attempts failures per username are kept.
+        """
+        max_attempts = min(max_attempts or self.max_attempts, self.max_attempts)
+        window = window or self.window
+
+        try:
+            if self.backend.count(f'user:{username}', max_attempts, window) >= max_attempts:
+                return True
+            if ip_address and self.backend.count(f'ip:{ip_address}', self.max_attempts_per_ip, window) >= self.max_attempts_per_ip:
+                return True
+        except Exception as e:
+            logger.error(f"Failed to check rate limit: {e}")
+        return False
+
+    def record_failure(self, username, ip_address=None):
+        try:
+            self.backend.add(f'user:{username}', self.max_attempts, self.window)
+            if ip_address:
+                self.backend.add(f'ip:{ip_address}', self.max_attempts_per_ip, self.window)
+        except Exception as e:
+            logger.error(f"Failed to record failed login: {e}")
+
+    def failure_count(self, username, window=None):
+        """Recent failures for a username; the count is capped at max_attempts"""
+        try:
+            return self.backend.count(f'user:{username}', self.max_attempts, window or self.window)
+        except Exception as e:
+            logger.error(f"Failed to count failed logins: {e}")
+            return 0
+
+    def reset(self, username):
+        try:
+            self.backend.reset(f'user:{username}')
+        except Exception as e:
+            logger.error(f"Failed to reset rate limit: {e}")
+
+
+# Shared instance, bound to an app with login_limiter.init_app(app)
+login_limiter = LoginRateLimiter()
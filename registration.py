@@ -0,0 +1,51 @@
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+UNIQUE_FIELDS = ('username', 'email')
+
+
+def taken_fields(User, username, email):
+    """Which of username and email are already registered, in one query"""
+    rows = (User.query
+            .with_entities(User.username, User.email)
+            .filter(or_(User.username == username, User.email == email))
+            .limit(2)
+            .all())
+    taken = set()
+    for row in rows:
+        if row.username == username:
+            taken.add('username')
+        if row.email == email:
+            taken.add('email')
+    return taken
+
+
+def register_user(db, User, username, email, password, role='user'):
+    """Create a user; returns (user, taken) where taken is a set of conflicting fields.
+
+    A single probe turns away names that are already taken before the
+    password is hashed, so duplicate-signup floods cost no PBKDF2 time.
+    The INSERT itself relies on the unique indexes: a signup that races
+    past the probe fails there, and the IntegrityError is mapped back to
+    the conflicting fields.
+    """
+    taken = taken_fields(User, username, email)
+    if taken:
+        return None, taken
+
+    user = User(username=username, email=email, role=role)
+    user.set_password(password)
+    db.session.add(user)
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return None, _conflicting_fields(e) or taken_fields(User, username, email) or set(UNIQUE_FIELDS)
+    return user, set()
+
+
+def _conflicting_fields(error):
+    # SQLite: "UNIQUE constraint failed: users.email"; PostgreSQL and MySQL
+    # name the violated index or key, which contains the column name
+    message = str(error.orig).lower()
+    return {field for field in UNIQUE_FIELDS if field in message}
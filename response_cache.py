@@ -0,0 +1,165 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+
+
+def _etag(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _user_key():
+    """What layout.html renders about the user: the nav depends on the role,
+    the header on the username. A renamed or promoted user gets a new key."""
+    if not current_user.is_authenticated:
+        return None
+    return current_user.get_id(), current_user.username, current_user.role
+
+
+class ResponseCache:
+    """Rendered-response cache with ETags and 304s for GET views.
+
+    @response_cache.cached() stores a view's full 200 response, keyed by
+    endpoint, URL arguments, query string and the current user's id,
+    username and role (shared=True drops the user part for pages that
+    show nothing about the user). Every cached response carries an ETag
+    of its body (weak when sent compressed), and a matching If-None-Match
+    gets a 304 without rendering. An entry keeps each compressed form of
+    its body once compression.py has produced it. A page is neither
+    served from nor stored in the cache while flash messages are pending,
+    or if the view changed the session.
+    @response_cache.conditional adds the ETag/304 handling alone, for
+    views whose output changes too often to store.
+
+    Entries expire after RESPONSE_CACHE_TTL seconds. invalidate() drops
+    them for some endpoints, or all of them, whenever what a page shows
+    changes outside a deploy.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.max_entries = 1024
+        self.ttl = 300
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires, etag, body, status, mimetype, {encoding: body})
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE', True)
+        self.max_entries = app.config.get('RESPONSE_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', self.ttl)
+        app.extensions['response_cache'] = self
+
+    def cached(self, shared=False):
+        """Cache the decorated GET view's rendered response"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if (not self.enabled or self.max_entries <= 0 or request.method != 'GET'
+                        or session.get('_flashes')):
+                    return view(*args, **kwargs)
+
+                key = (request.endpoint, tuple(sorted(kwargs.items())),
+                       request.query_string, None if shared else _user_key())
+                now = time.monotonic()
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and entry[0] <= now:
+                        del self._entries[key]
+                        entry = None
+                    if entry is not None:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                    else:
+                        self.misses += 1
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed or session.modified:
+                        return response
+                    body = response.get_data()
+                    entry = (now + self.ttl, _etag(body), body, response.status_code, response.mimetype, {})
+                    with self._lock:
+                        self._entries[key] = entry
+                        while len(self._entries) > self.max_entries:
+                            self._entries.popitem(last=False)
+                else:
+                    response = current_app.response_class(entry[2], status=entry[3], mimetype=entry[4])
+
+                encoding = self._encode(response, entry)
+                # Compressed bytes differ from the body the ETag was taken from
+                response.set_etag(entry[1], weak=encoding is not None)
+                response.cache_control.no_cache = True
+                if shared:
+                    response.cache_control.public = True
+                else:
+                    response.cache_control.private = True
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _encode(response, entry):
+        """Send the entry's compressed body when the client accepts one.
+
+        Each encoding is compressed once per entry and kept alongside it,
+        so hits serve stored bytes. Returns the encoding used, or None.
+        """
+        compression = current_app.extensions.get('compression')
+        if compression is None:
+            return None
+        encoding = compression.negotiate(entry[4], len(entry[2]))
+        if encoding is None:
+            return None
+        variants = entry[5]
+        data = variants.get(encoding)
+        if data is None:
+            data = variants[encoding] = compression.compress(entry[2], encoding)
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return encoding
+
+    @staticmethod
+    def conditional(view):
+        """ETag and If-None-Match handling without storing the response"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if request.method != 'GET' or response.status_code != 200 or response.is_streamed:
+                return response
+            if not response.get_etag()[0]:
+                response.set_etag(_etag(response.get_data()))
+            return response.make_conditional(request)
+        return wrapper
+
+    def invalidate(self, *endpoints):
+        """Drop cached responses of the given endpoints, or every one if none are given"""
+        with self._lock:
+            if not endpoints:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            stale = [key for key in self._entries if key[0] in endpoints]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+# Shared instance, bound to an app with response_cache.init_app(app)
+response_cache = ResponseCache()
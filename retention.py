@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Retention job for the Vault-Tec audit tables
+
+Deletes old LoginAttempt rows and rolls old SecurityLog rows up into
+per-day counts (SecurityLogDaily). Each batch is a short transaction of
+at most RETENTION_BATCH_SIZE rows, so the job can run next to live
+traffic without holding long write locks.
+
+Run it from cron, e.g. nightly:
+    python retention.py
+    python retention.py --login-days 7 --log-days 30 --batch-size 2000
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import Flask, current_app
+
+from config import Config, config
+from models import LoginAttempt, SecurityLog, SecurityLogDaily, db
+
+
+def prune_login_attempts(older_than, batch_size=5000):
+    """Delete login attempts before older_than in batches; returns rows deleted"""
+    deleted = 0
+    while True:
+        ids = [row.id for row in db.session.query(LoginAttempt.id)
+               .filter(LoginAttempt.attempt_time < older_than)
+               .order_by(LoginAttempt.attempt_time)
+               .limit(batch_size)]
+        if not ids:
+            return deleted
+
+        LoginAttempt.query.filter(LoginAttempt.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+
+
+def rollup_security_logs(older_than, batch_size=5000):
+    """Fold security logs before older_than into daily counts, then delete them.
+
+    The counts and the delete for a batch commit together, so an
+    interrupted run never double-counts. Returns rows rolled up.
+    """
+    rolled = 0
+    while True:
+        rows = (db.session.query(SecurityLog.id, SecurityLog.event_type, SecurityLog.created)
+                .filter(SecurityLog.created < older_than)
+                .order_by(SecurityLog.created)
+                .limit(batch_size)
+                .all())
+        if not rows:
+            return rolled
+
+        counts = Counter((row.created.date(), row.event_type) for row in rows)
+        for (day, event_type), count in counts.items():
+            summary = db.session.get(SecurityLogDaily, (day, event_type))
+            if summary is None:
+                db.session.add(SecurityLogDaily(day=day, event_type=event_type, count=count))
+            else:
+                summary.count += count
+
+        SecurityLog.query.filter(SecurityLog.id.in_([row.id for row in rows])).delete(synchronize_session=False)
+        db.session.commit()
+        rolled += len(rows)
+
+
+def run_retention(login_days=None, log_days=None, batch_size=None):
+    """Apply the configured retention to both audit tables (needs an app context)"""
+    # 0 is a valid retention (drop everything up to now), so only None means default
+    if login_days is None:
+        login_days = current_app.config.get('LOGIN_ATTEMPT_RETENTION_DAYS', Config.LOGIN_ATTEMPT_RETENTION_DAYS)
+    if log_days is None:
+        log_days = current_app.config.get('SECURITY_LOG_RETENTION_DAYS', Config.SECURITY_LOG_RETENTION_DAYS)
+    batch_size = batch_size or current_app.config.get('RETENTION_BATCH_SIZE', Config.RETENTION_BATCH_SIZE)
+
+    now = datetime.utcnow()
+    return {
+        'login_attempts_deleted': prune_login_attempts(now - timedelta(days=login_days), batch_size),
+        'security_logs_rolled_up': rollup_security_logs(now - timedelta(days=log_days), batch_size)
+    }
+
+
+def create_app():
+    """Minimal app bound to the configured database"""
+    app = Flask(__name__)
+    app.config.from_object(config[os.environ.get('FLASK_ENV', 'default')])
+    db.init_app(app)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prune and roll up Vault-Tec audit tables')
+    parser.add_argument('--login-days', type=int, help='keep login attempts this many days')
+    parser.add_argument('--log-days', type=int, help='keep detailed security logs this many days')
+    parser.add_argument('--batch-size', type=int, help='rows per transaction')
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        try:
+            result = run_retention(args.login_days, args.log_days, args.batch_size)
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Retention failed: {e}")
+            sys.exit(1)
+
+    print(f"✓ Deleted {result['login_attempts_deleted']} login attempts")
+    print(f"✓ Rolled up {result['security_logs_rolled_up']} security log entries")
+
+
+if __name__ == '__main__':
+    main()
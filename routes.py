@@ -5,11 +5,22 @@ import bleach
 
 # FIX: Import db from your extensions or models to avoid circular import with 'app'
 from models import User, db 
-from security import InputValidator, SecurityMonitor
+from security import InputValidator, SecurityMonitor, SessionSecurity
+from hash_pool import HashPoolSaturated
+from audit_writer import audit_writer
+from user_listing import list_users
+from registration import register_user
+from user_export import EXPORT_FORMATS, export_users_response
+from user_stats import user_stats
+from response_cache import response_cache
 
 def init_routes(app):
     """Initialize all routes"""
     
+    @app.before_request
+    def check_session():
+        SessionSecurity.validate_session()
+    
     @app.route('/')
     def index():
         if current_user.is_authenticated:
@@ -32,11 +43,15 @@ def init_routes(app):
             user = User.query.filter_by(username=username).first()
             
             # Use the check_password method from your User model
-            is_valid = user and user.check_password(password)
+            try:
+                is_valid = user and user.check_password(password)
+            except HashPoolSaturated:
+                flash('Authentication systems overloaded. Please try again shortly.', 'error')
+                return render_template('login.html'), 503
             
             SecurityMonitor.record_login_attempt(
                 username, 
-                success=is_valid,
+                success=bool(is_valid),
                 user_agent=request.user_agent.string[:200]
             )
             
@@ -47,6 +62,7 @@ def init_routes(app):
                     flash('Account is deactivated', 'error')
                     return render_template('login.html')
                 
+                SessionSecurity.rotate_session()
                 login_user(user)
                 user.update_last_login()
                 
@@ -70,24 +86,22 @@ def init_routes(app):
             email = InputValidator.sanitize_input(request.form.get('email', ''))
             password = request.form.get('password', '')
             
-            # Check if exists
-            if User.query.filter((User.username == username) | (User.email == email)).first():
-                flash('Username or Email already exists', 'error')
-                return render_template('register.html')
-            
             try:
-                new_user = User(username=username, email=email, role='user')
-                new_user.set_password(password)
-                
-                db.session.add(new_user)
-                db.session.commit()
-                
-                flash('Registration successful!', 'success')
-                return redirect(url_for('login'))
+                new_user, taken = register_user(db, User, username, email, password)
             except Exception:
                 db.session.rollback()
                 flash('Registration failed.', 'error')
                 return render_template('register.html')
+            
+            if taken:
+                if 'username' in taken:
+                    flash('Username already exists', 'error')
+                if 'email' in taken:
+                    flash('Email already exists', 'error')
+                return render_template('register.html')
+            
+            flash('Registration successful!', 'success')
+            return redirect(url_for('login'))
         
         return render_template('register.html')
 
@@ -103,11 +117,64 @@ def init_routes(app):
         if not current_user.is_admin:
             abort(403)
         
-        users = User.query.order_by(User.created_at.desc()).all()
-        return render_template('admin_panel.html', users=users)
+        search = request.args.get('q', '').strip()
+        role = request.args.get('role') if request.args.get('role') in ('admin', 'user') else None
+        users, next_cursor = list_users(
+            User,
+            cursor=request.args.get('after'),
+            search=search or None,
+            role=role,
+            per_page=current_app.config.get('ADMIN_USERS_PER_PAGE', 50)
+        )
+        total_users, admin_count, _ = user_stats.snapshot()
+        return render_template('admin_panel.html', users=users, next_cursor=next_cursor,
+                               search=search, role=role, total_users=total_users,
+                               admin_count=admin_count)
+    
+    @app.route('/api/admin/audit-writer')
+    @login_required
+    def audit_writer_stats():
+        """Queue depth and dropped/written counts for the audit writer"""
+        if not current_user.is_admin:
+            abort(403)
+        
+        return jsonify(audit_writer.stats())
+    
+    @app.route('/api/admin/security-report')
+    @login_required
+    @response_cache.conditional
+    def security_report():
+        """Security events per day and type (?days=7, at most 90)"""
+        if not current_user.is_admin:
+            abort(403)
+        
+        days = min(max(request.args.get('days', 7, type=int), 1), 90)
+        return jsonify({'days': days, 'events': SecurityMonitor.event_summary(days)})
+    
+    @app.route('/api/admin/revoke-sessions/<int:user_id>', methods=['POST'])
+    @login_required
+    def revoke_sessions(user_id):
+        """Log a user out everywhere"""
+        if not current_user.is_admin:
+            abort(403)
+        
+        return jsonify({'user_id': user_id, 'revoked': SessionSecurity.revoke_user_sessions(user_id)})
+    
+    @app.route('/api/admin/export-users')
+    @login_required
+    def export_users():
+        """Stream every user as CSV or NDJSON (?format=csv|ndjson)"""
+        if not current_user.is_admin:
+            abort(403)
+        
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            abort(400)
+        return export_users_response(User, fmt, batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000))
     
     @app.route('/strength-tester')
     @login_required
+    @response_cache.cached()
     def strength_tester():
         return render_template('strength_tester.html')
     
@@ -1,7 +1,9 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from password_hashing import hashing_policy
+from db_routing import RoutingSession, configure_replica
+from sqlite_profile import sqlite_profile
 from datetime import datetime
 import os
 
@@ -9,8 +11,14 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'vault-tec-secure-key-2077'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///pipboy.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLITE_PRODUCTION'] = os.environ.get('FLASK_ENV') == 'production'
+app.config['SQLALCHEMY_REPLICA_URI'] = os.environ.get('DATABASE_REPLICA_URL')
 
-db = SQLAlchemy(app)
+sqlite_profile.configure(app)
+configure_replica(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+sqlite_profile.init_app(app, db)
+hashing_policy.init_app(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
@@ -25,10 +33,10 @@ class User(UserMixin, db.Model):
     last_login = db.Column(db.DateTime)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hashing_policy.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return hashing_policy.verify(self, password)
     
     def is_admin(self):
         return self.role == 'admin'
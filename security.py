@@ -1,9 +1,15 @@
 import bleach
+import hashlib
 import re
 from html import escape
-from datetime import datetime, timedelta
-from flask import request, current_app
-from models import LoginAttempt, SecurityLog, db
+from datetime import datetime, time, timedelta
+from flask import request, current_app, session
+from sqlalchemy import func
+from models import LoginAttempt, SecurityLog, SecurityLogDaily, db
+from db_routing import reporting
+from session_store import rotate_session, session_store
+from rate_limit import login_limiter
+from audit_writer import audit_writer
 
 class InputValidator:
     """Prevent SQL Injection & XSS attacks"""
@@ -86,67 +92,72 @@ class SecurityMonitor:
     
     @staticmethod
     def log_security_event(event_type, username=None, details=None):
-        """Log security-related events"""
+        """Log security-related events (written in the background by audit_writer)"""
         try:
-            log = SecurityLog(
+            audit_writer.enqueue(
+                SecurityLog,
                 event_type=event_type,
                 username=username,
                 ip_address=request.remote_addr,
-                details=details
+                details=details,
+                created=datetime.utcnow()
             )
-            db.session.add(log)
-            db.session.commit()
         except Exception as e:
             current_app.logger.error(f"Failed to log security event: {e}")
     
     @staticmethod
     def record_login_attempt(username, success, user_agent=None):
         """Record login attempt for rate limiting and monitoring"""
+        if not success:
+            login_limiter.record_failure(username, request.remote_addr)
+        
         try:
-            attempt = LoginAttempt(
+            audit_writer.enqueue(
+                LoginAttempt,
                 username=username,
                 ip_address=request.remote_addr,
                 success=success,
-                user_agent=user_agent
+                user_agent=user_agent,
+                attempt_time=datetime.utcnow()
             )
-            db.session.add(attempt)
-            db.session.commit()
         except Exception as e:
             current_app.logger.error(f"Failed to record login attempt: {e}")
     
     @staticmethod
-    def check_rate_limit(username, max_attempts=5, lockout_minutes=5):
-        """Check if user has exceeded login attempts"""
-        try:
-            lockout_time = datetime.utcnow() - timedelta(minutes=lockout_minutes)
-            
-            recent_attempts = LoginAttempt.query.filter(
-                LoginAttempt.username == username,
-                LoginAttempt.attempt_time > lockout_time,
-                LoginAttempt.success == False
-            ).count()
-            
-            return recent_attempts >= max_attempts
-        except Exception as e:
-            current_app.logger.error(f"Failed to check rate limit: {e}")
-            return False
+    def check_rate_limit(username, max_attempts=None, lockout_minutes=None):
+        """Check if user or client address has exceeded login attempts"""
+        window = lockout_minutes * 60 if lockout_minutes else None
+        return login_limiter.is_limited(username, request.remote_addr, max_attempts, window)
     
     @staticmethod
-    def get_failed_attempts_count(username, minutes=5):
+    def get_failed_attempts_count(username, minutes=None):
         """Get count of failed login attempts in last X minutes"""
-        try:
-            cutoff_time = datetime.utcnow() - timedelta(minutes=minutes)
-            
-            count = LoginAttempt.query.filter(
-                LoginAttempt.username == username,
-                LoginAttempt.attempt_time > cutoff_time,
-                LoginAttempt.success == False
-            ).count()
-            
-            return count
-        except Exception as e:
-            current_app.logger.error(f"Failed to get failed attempts count: {e}")
-            return 0
+        return login_limiter.failure_count(username, minutes * 60 if minutes else None)
+    
+    @staticmethod
+    def event_summary(days=7):
+        """Security events per day and type for the last `days` days (replica if set).
+        
+        Recent days are counted from SecurityLog. Days the retention job has
+        already rolled up come from SecurityLogDaily.
+        """
+        since = (datetime.utcnow() - timedelta(days=days - 1)).date()
+        day = func.date(SecurityLog.created)
+        counts = {}
+        with reporting():
+            for row in (db.session.query(day.label('day'), SecurityLog.event_type, func.count())
+                        .filter(SecurityLog.created >= datetime.combine(since, time.min))
+                        .group_by(day, SecurityLog.event_type)):
+                key = (str(row[0]), row[1])
+                counts[key] = counts.get(key, 0) + row[2]
+            for summary in SecurityLogDaily.query.filter(SecurityLogDaily.day >= since):
+                key = (summary.day.isoformat(), summary.event_type)
+                counts[key] = counts.get(key, 0) + summary.count
+        
+        return [
+            {'day': day, 'event_type': event_type, 'count': count}
+            for (day, event_type), count in sorted(counts.items())
+        ]
 
 
 class SessionSecurity:
@@ -154,13 +165,25 @@ class SessionSecurity:
     
     @staticmethod
     def validate_session():
-        """Validate current session"""
-        # Check session age
-        # Check IP consistency
-        # Check user agent consistency
-        pass
+        """Check the session was issued to this client; clears it if not"""
+        fingerprint = session.get('_fp')
+        if fingerprint is not None and fingerprint != _client_fingerprint():
+            session.clear()
+            return False
+        return True
     
     @staticmethod
     def rotate_session():
-        """Rotate session ID for security"""
-        pass
\ No newline at end of file
+        """Move the session to a new id (after login) and bind it to this client"""
+        rotate_session()
+        session['_fp'] = _client_fingerprint()
+    
+    @staticmethod
+    def revoke_user_sessions(user_id):
+        """Log a user out of every session; returns how many were ended"""
+        return session_store.revoke_user(user_id)
+
+
+def _client_fingerprint():
+    user_agent = request.headers.get('User-Agent', '')
+    return hashlib.blake2b(user_agent.encode('utf-8', 'replace'), digest_size=8).hexdigest()
@@ -0,0 +1,290 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from flask import session as current_session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SessionInterface
+
+# Flask-Login keeps the logged-in user's id under this key
+_USER_KEY = '_user_id'
+
+_serializer = TaggedJSONSerializer()
+
+
+class ServerSession(SecureCookieSession):
+    """Session whose data lives in a SessionStore; the cookie holds only its id"""
+
+    def __init__(self, initial=None, sid=None, expires=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.expires = expires
+        self.previous_sid = None
+
+    def rotate(self):
+        """Move the data to a fresh id on save; the old id stops working"""
+        if self.sid is not None:
+            self.previous_sid = self.sid
+            self.sid = None
+        self.modified = True
+
+
+class MemoryBackend:
+    """Per-process store, one serialized record per session id.
+
+    Records are kept in expiry order (every write moves a record to the
+    end with expiry now + lifetime), so sweeping and evicting past
+    `max_entries` only pop from the front. A user id -> session ids index
+    makes revoking one user's sessions independent of the total count.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._records = OrderedDict()  # sid -> (expires, user_id, data)
+        self._by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, sid, now):
+        with self._lock:
+            record = self._records.get(sid)
+        if record is None or record[0] <= now:
+            return None
+        return record
+
+    def save(self, sid, user_id, data, expires):
+        with self._lock:
+            old = self._records.pop(sid, None)
+            if old is not None and old[1] != user_id:
+                self._unindex(sid, old[1])
+            self._records[sid] = (expires, user_id, data)
+            if user_id is not None:
+                self._by_user.setdefault(user_id, set()).add(sid)
+            while len(self._records) > self.max_entries:
+                self._drop_oldest()
+
+    def touch(self, sid, expires):
+        with self._lock:
+            record = self._records.pop(sid, None)
+            if record is not None:
+                self._records[sid] = (expires,) + record[1:]
+
+    def delete(self, sid):
+        with self._lock:
+            record = self._records.pop(sid, None)
+            if record is not None:
+                self._unindex(sid, record[1])
+
+    def delete_user(self, user_id):
+        with self._lock:
+            sids = self._by_user.pop(user_id, ())
+            for sid in sids:
+                self._records.pop(sid, None)
+            return len(sids)
+
+    def sweep(self, now):
+        removed = 0
+        with self._lock:
+            while self._records:
+                expires = next(iter(self._records.values()))[0]
+                if expires > now:
+                    break
+                self._drop_oldest()
+                removed += 1
+        return removed
+
+    def count(self):
+        return len(self._records)
+
+    def _drop_oldest(self):
+        sid, record = self._records.popitem(last=False)
+        self._unindex(sid, record[1])
+
+    def _unindex(self, sid, user_id):
+        sids = self._by_user.get(user_id)
+        if sids is not None:
+            sids.discard(sid)
+            if not sids:
+                del self._by_user[user_id]
+
+
+class SQLiteBackend:
+    """Store in a SQLite file, shared by every worker on the host.
+
+    Sessions are looked up by primary key. Indexes on user_id and expires
+    make revocation and sweeping range deletes instead of scans. Each
+    thread keeps its own connection, in WAL mode and autocommit.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        connection = self._connection()
+        connection.executescript('''
+            CREATE TABLE IF NOT EXISTS sessions (
+                sid TEXT PRIMARY KEY,
+                user_id TEXT,
+                expires REAL NOT NULL,
+                data TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id);
+            CREATE INDEX IF NOT EXISTS ix_sessions_expires ON sessions (expires);
+        ''')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, sid, now):
+        return self._connection().execute(
+            'SELECT expires, user_id, data FROM sessions WHERE sid = ? AND expires > ?', (sid, now)
+        ).fetchone()
+
+    def save(self, sid, user_id, data, expires):
+        self._connection().execute(
+            'INSERT OR REPLACE INTO sessions (sid, user_id, expires, data) VALUES (?, ?, ?, ?)',
+            (sid, user_id, expires, data)
+        )
+
+    def touch(self, sid, expires):
+        self._connection().execute('UPDATE sessions SET expires = ? WHERE sid = ?', (expires, sid))
+
+    def delete(self, sid):
+        self._connection().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def delete_user(self, user_id):
+        return self._connection().execute('DELETE FROM sessions WHERE user_id = ?', (user_id,)).rowcount
+
+    def sweep(self, now):
+        return self._connection().execute('DELETE FROM sessions WHERE expires <= ?', (now,)).rowcount
+
+    def count(self):
+        return self._connection().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+
+class SessionStore(SessionInterface):
+    """Server-side sessions behind Flask's session interface.
+
+    The cookie carries a random 256-bit id and nothing else, so it stays a
+    fixed ~50 bytes. It needs no signing, because an id can't be forged
+    any more easily than guessed. Records expire PERMANENT_SESSION_LIFETIME
+    after their last write. An unchanged session is only re-written once
+    less than half its lifetime is left. Expired records are swept in bulk
+    every SESSION_SWEEP_INTERVAL seconds.
+
+    SESSION_STORE selects the backend: 'sqlite' (SESSION_STORE_PATH, shared
+    between workers and reloads), 'memory' (one process only; sessions
+    are lost on restart and invisible to other workers) or 'cookie', the
+    default, to keep Flask's signed-cookie sessions.
+    """
+
+    session_class = ServerSession
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.lifetime = 1800
+        self.sweep_interval = 60
+        self._next_sweep = 0
+
+    def init_app(self, app):
+        kind = app.config.get('SESSION_STORE', 'cookie')
+        if kind == 'cookie':
+            return
+        if self.backend is None:
+            if kind == 'sqlite':
+                path = app.config.get('SESSION_STORE_PATH') or os.path.join(app.instance_path, 'sessions.db')
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self.backend = SQLiteBackend(path)
+            elif kind == 'memory':
+                self.backend = MemoryBackend(app.config.get('SESSION_STORE_MAX_ENTRIES', 100000))
+            else:
+                raise ValueError(f'Unsupported SESSION_STORE: {kind}')
+
+        lifetime = app.config.get('PERMANENT_SESSION_LIFETIME', self.lifetime)
+        self.lifetime = lifetime.total_seconds() if isinstance(lifetime, timedelta) else lifetime
+        self.sweep_interval = app.config.get('SESSION_SWEEP_INTERVAL', self.sweep_interval)
+        app.session_interface = self
+        app.extensions['session_store'] = self
+
+    def open_session(self, app, request):
+        now = time.time()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.backend.sweep(now)
+
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            record = self.backend.get(sid, now)
+            if record is not None:
+                return self.session_class(_serializer.loads(record[2]), sid=sid, expires=record[0])
+        return self.session_class()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if session.previous_sid is not None:
+            self.backend.delete(session.previous_sid)
+
+        if not session:
+            if session.modified:
+                if session.sid is not None:
+                    self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        now = time.time()
+        expires = now + self.lifetime
+        new_sid = session.sid is None
+        if new_sid:
+            session.sid = secrets.token_urlsafe(32)
+
+        if new_sid or session.modified:
+            user_id = session.get(_USER_KEY)
+            self.backend.save(session.sid, str(user_id) if user_id is not None else None,
+                              _serializer.dumps(dict(session)), expires)
+        elif session.expires - now < self.lifetime / 2:
+            self.backend.touch(session.sid, expires)
+        else:
+            return  # Record still fresh and the browser already has the cookie
+
+        response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                            httponly=httponly, domain=domain, path=path, secure=secure,
+                            samesite=samesite)
+        response.vary.add('Cookie')
+
+    def revoke_user(self, user_id):
+        """End every session of a user; returns how many were removed.
+        Signed-cookie sessions have nothing server-side to end, so 0."""
+        if self.backend is None:
+            return 0
+        return self.backend.delete_user(str(user_id))
+
+
+def rotate_session():
+    """Give the current session a new id, e.g. after login (no-op for cookie sessions)"""
+    if isinstance(current_session._get_current_object(), ServerSession):
+        current_session.rotate()
+        return True
+    return False
+
+
+# Shared instance, bound to an app with session_store.init_app(app)
+session_store = SessionStore()
@@ -0,0 +1,92 @@
+from functools import partial
+
+from sqlalchemy import event
+
+from db_routing import READ_BIND, REPLICA_BIND
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',  # readers no longer block the writer, or the writer readers
+    'synchronous': 'NORMAL',  # fsync at checkpoints, not every commit; safe with WAL
+    'cache_size': -65536,  # negative = KiB, i.e. 64 MB page cache per connection
+    'mmap_size': 268435456,  # read up to 256 MB of the file through the page cache
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000  # ms to wait for the write lock before SQLITE_BUSY
+}
+
+
+class SQLiteProfile:
+    """Production settings for a SQLite file database.
+
+    configure(app) runs before the SQLAlchemy extension is bound. It sizes
+    the pools: a small write pool (SQLite takes one writer at a time, so
+    writers queue on the pool rather than spin on the file lock) and a
+    larger read pool under the READ_BIND key. init_app(app, db) then runs
+    the pragmas on every new connection. Read connections, and those of a
+    SQLite replica, are also set query_only. Both do nothing unless
+    SQLITE_PRODUCTION is set and the database is a SQLite file.
+    """
+
+    def __init__(self):
+        self.enabled = False
+
+    def configure(self, app):
+        uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        self.enabled = bool(app.config.get('SQLITE_PRODUCTION')) and _is_sqlite_file(uri)
+        if not self.enabled:
+            return False
+
+        connect_args = {
+            'check_same_thread': False,
+            'timeout': app.config.get('SQLITE_BUSY_TIMEOUT', 5)
+        }
+        pool_timeout = app.config.get('SQLITE_POOL_TIMEOUT', 30)
+
+        engine_options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        engine_options.update(
+            pool_size=app.config.get('SQLITE_WRITE_POOL_SIZE', 1),
+            max_overflow=0,
+            pool_timeout=pool_timeout,
+            connect_args=connect_args
+        )
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds[READ_BIND] = {
+            'url': uri,
+            'pool_size': app.config.get('SQLITE_READ_POOL_SIZE', 8),
+            'max_overflow': app.config.get('SQLITE_READ_POOL_OVERFLOW', 8),
+            'pool_timeout': pool_timeout,
+            'connect_args': connect_args
+        }
+        app.config['SQLALCHEMY_BINDS'] = binds
+        return True
+
+    def init_app(self, app, db):
+        if not self.enabled:
+            return
+        pragmas = dict(DEFAULT_PRAGMAS, **(app.config.get('SQLITE_PRAGMAS') or {}))
+        with app.app_context():
+            engines = dict(db.engines)
+        for key, engine in engines.items():
+            if engine.dialect.name != 'sqlite':
+                continue
+            engine_pragmas = dict(pragmas, query_only='ON') if key in (READ_BIND, REPLICA_BIND) else pragmas
+            event.listen(engine, 'connect', partial(_apply_pragmas, engine_pragmas))
+        app.extensions['sqlite_profile'] = self
+
+
+def _apply_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def _is_sqlite_file(uri):
+    return uri.startswith('sqlite') and ':memory:' not in uri and uri.rstrip('/') not in ('sqlite:', 'sqlite+pysqlite:')
+
+
+# Shared instance: sqlite_profile.configure(app) before the db, init_app(app, db) after
+sqlite_profile = SQLiteProfile()
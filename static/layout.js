@@ -0,0 +1,73 @@
+// Pip-Boy layout: boot sequence and ambient geiger clicks
+document.addEventListener('DOMContentLoaded', function() {
+    // Boot sequence only on first visit
+    if (!sessionStorage.getItem('pipboy_booted')) {
+        showBootSequence();
+        sessionStorage.setItem('pipboy_booted', 'true');
+    }
+
+    // Random geiger clicks
+    setInterval(() => {
+        if (Math.random() < 0.05) { // 5% chance
+            if (window.playSound) {
+                window.playSound('geiger');
+            }
+        }
+    }, 2000);
+});
+
+function showBootSequence() {
+    const bootText = `
+╔══════════════════════════════════════════════╗
+║        VAULT-TEC INDUSTRIES BOOTLOADER      ║
+║              PIP-BOY 3000 MK IV             ║
+║              FIRMWARE v2.1.7                ║
+║                                              ║
+║  INITIALIZING SECURITY SUBSYSTEM...   [OK]  ║
+║  LOADING USER INTERFACE...            [OK]  ║
+║  CALIBRATING GEIGER COUNTER...        [OK]  ║
+║  SYNCING WITH VAULT NETWORK...        [OK]  ║
+║                                              ║
+║            WELCOME TO THE WASTELAND          ║
+╚══════════════════════════════════════════════╝
+`;
+
+    const bootDiv = document.createElement('div');
+    bootDiv.className = 'boot-sequence';
+    bootDiv.innerHTML = `<pre class="boot-text">${bootText}</pre>`;
+    document.body.appendChild(bootDiv);
+
+    // Type out boot sequence
+    const pre = bootDiv.querySelector('pre');
+    const originalText = pre.textContent;
+    pre.textContent = '';
+    let i = 0;
+
+    function typeBoot() {
+        if (i < originalText.length) {
+            pre.textContent += originalText.charAt(i);
+            i++;
+            setTimeout(typeBoot, 30);
+
+            // Add typing sound
+            if (i % 3 === 0 && window.playSound) {
+                window.playSound('click');
+            }
+        } else {
+            // Fade out after delay
+            setTimeout(() => {
+                bootDiv.style.opacity = '0';
+                bootDiv.style.transition = 'opacity 1s';
+                setTimeout(() => {
+                    bootDiv.remove();
+                    // Play startup sound
+                    if (window.playSound) {
+                        window.playSound('boot');
+                    }
+                }, 1000);
+            }, 2000);
+        }
+    }
+
+    setTimeout(typeBoot, 500);
+}
@@ -1,12 +1,18 @@
 // Password Strength Meter with Pip-Boy Theme
 class PasswordStrengthMeter {
-    constructor() {
+    constructor(options = {}) {
         this.commonPasswords = new Set([
             'password', '123456', '12345678', '123456789', '12345',
             'qwerty', 'abc123', 'password1', 'admin', 'letmein',
             'welcome', 'monkey', 'dragon', 'football', 'baseball'
         ]);
         
+        // Backend checks wait until typing pauses for this long (ms)
+        this.debounceMs = typeof options.debounceMs === 'number' ? options.debounceMs : 300;
+        this.backendTimer = null;
+        this.pendingRequest = null;
+        this.lastSentPassword = null;
+        
         this.initializeElements();
         this.bindEvents();
     }
@@ -22,6 +28,14 @@ class PasswordStrengthMeter {
             this.timestampElement = document.getElementById('timestamp');
             this.scanIdElement = document.getElementById('scan-id');
             this.feedbackList = document.getElementById('feedback-list');
+            
+            // <input data-debounce="500"> overrides the default delay
+            if (this.passwordInput && this.passwordInput.dataset.debounce) {
+                const delay = parseInt(this.passwordInput.dataset.debounce, 10);
+                if (!isNaN(delay) && delay >= 0) {
+                    this.debounceMs = delay;
+                }
+            }
         } catch (e) {
             console.log('Error initializing elements:', e);
         }
@@ -48,6 +62,7 @@ class PasswordStrengthMeter {
 
     analyzePassword(password) {
         if (!password) {
+            this.cancelBackend();
             this.resetDisplay();
             return;
         }
@@ -55,11 +70,46 @@ class PasswordStrengthMeter {
         const analysis = this.calculateStrength(password);
         this.updateDisplay(analysis);
         
-        // Send to backend for additional analysis
-        this.sendToBackend(password).catch(e => {
-            // Silently fail backend analysis
-            console.log('Backend analysis failed:', e);
-        });
+        // Send to backend for additional analysis once typing pauses
+        this.scheduleBackend(password, analysis);
+    }
+
+    needsBackend(password, analysis) {
+        // Skip the request when the local analysis already settles the result
+        if (password === this.lastSentPassword) return false;
+        if (password.length < 8) return false;
+        if (analysis && analysis.isCommon) return false;
+        return true;
+    }
+
+    scheduleBackend(password, analysis) {
+        this.cancelBackend();
+        
+        if (!this.needsBackend(password, analysis)) {
+            return;
+        }
+        
+        this.backendTimer = setTimeout(() => {
+            this.backendTimer = null;
+            this.sendToBackend(password).catch(e => {
+                // Silently fail backend analysis; superseded requests are expected
+                if (e && e.name !== 'AbortError') {
+                    console.log('Backend analysis failed:', e);
+                }
+            });
+        }, this.debounceMs);
+    }
+
+    cancelBackend() {
+        if (this.backendTimer) {
+            clearTimeout(this.backendTimer);
+            this.backendTimer = null;
+        }
+        
+        if (this.pendingRequest) {
+            this.pendingRequest.abort();
+            this.pendingRequest = null;
+        }
     }
 
     calculateStrength(password) {
@@ -113,7 +163,8 @@ class PasswordStrengthMeter {
         }
 
         // Dictionary check
-        if (this.commonPasswords.has(password.toLowerCase())) {
+        const isCommon = this.commonPasswords.has(password.toLowerCase());
+        if (isCommon) {
             score = Math.max(10, score - 40);
             feedback.unshift("CRITICAL: Common password detected - HIGH RISK");
         }
@@ -171,7 +222,8 @@ class PasswordStrengthMeter {
             color,
             feedback: feedback.length ? feedback : ["PASSWORD MEETS MINIMUM REQUIREMENTS"],
             timestamp,
-            scanId
+            scanId,
+            isCommon
         };
     }
 
@@ -308,13 +360,22 @@ class PasswordStrengthMeter {
             return;
         }
         
+        // Only the latest request matters; abort anything still in flight
+        if (this.pendingRequest) {
+            this.pendingRequest.abort();
+        }
+        const controller = typeof AbortController !== 'undefined' ? new AbortController() : null;
+        this.pendingRequest = controller;
+        this.lastSentPassword = password;
+        
         try {
             const response = await fetch('/api/check-password', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify({ password: password })
+                body: JSON.stringify({ password: password }),
+                signal: controller ? controller.signal : undefined
             });
             
             if (!response.ok) {
@@ -329,8 +390,16 @@ class PasswordStrengthMeter {
                 console.log('Backend analysis received');
             }
         } catch (error) {
+            // Let the same password be retried after a failure or abort
+            if (this.lastSentPassword === password) {
+                this.lastSentPassword = null;
+            }
             // Silently fail - frontend analysis is sufficient
             throw error;
+        } finally {
+            if (this.pendingRequest === controller) {
+                this.pendingRequest = null;
+            }
         }
     }
 }
@@ -0,0 +1,118 @@
+import os
+import threading
+from collections import OrderedDict
+
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache 'name', key... %}...{% endcache %} renders the body once per key.
+
+    The key values after the name say what the fragment depends on (the
+    endpoint, the user's role), so the output can be reused for every
+    request with the same values. Anything else the body reads is frozen
+    at first render. Caching is off when environment.fragment_cache_enabled
+    is false, e.g. in debug mode.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(
+            fragment_cache=OrderedDict(),
+            fragment_cache_size=1024,
+            fragment_cache_enabled=True,
+            fragment_cache_lock=threading.Lock()
+        )
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render', [nodes.List(args)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, key, caller):
+        env = self.environment
+        if not env.fragment_cache_enabled:
+            return caller()
+
+        key = tuple(key)
+        cache = env.fragment_cache
+        with env.fragment_cache_lock:
+            output = cache.get(key)
+            if output is not None:
+                cache.move_to_end(key)
+                return output
+
+        output = Markup(caller())
+        with env.fragment_cache_lock:
+            cache[key] = output
+            while len(cache) > env.fragment_cache_size:
+                cache.popitem(last=False)
+        return output
+
+
+class LazyValue:
+    """Template value computed only if a template prints or tests it"""
+
+    __slots__ = ('_func', '_value')
+
+    _unset = object()
+
+    def __init__(self, func):
+        self._func = func
+        self._value = self._unset
+
+    def _get(self):
+        if self._value is self._unset:
+            self._value = self._func()
+        return self._value
+
+    def __str__(self):
+        return str(self._get())
+
+    def __html__(self):
+        return Markup.escape(self._get())
+
+    def __bool__(self):
+        return bool(self._get())
+
+
+class TemplateCache:
+    """Bytecode and fragment caching for an app's Jinja environment.
+
+    Compiled templates are stored under TEMPLATE_BYTECODE_CACHE_DIR
+    (default instance/jinja_cache), so new workers load bytecode instead
+    of parsing and compiling every template. TEMPLATE_FRAGMENT_CACHE
+    (default: on unless debug) switches {% cache %} blocks on.
+    """
+
+    def init_app(self, app):
+        env = app.jinja_env
+        env.add_extension(FragmentCacheExtension)
+        env.fragment_cache_enabled = app.config.get('TEMPLATE_FRAGMENT_CACHE', not app.debug)
+        env.fragment_cache_size = app.config.get('TEMPLATE_FRAGMENT_CACHE_SIZE', env.fragment_cache_size)
+
+        directory = app.config.get('TEMPLATE_BYTECODE_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            env.bytecode_cache = FileSystemBytecodeCache(directory)
+        app.extensions['template_cache'] = self
+
+    @staticmethod
+    def clear(app):
+        """Drop cached fragments, e.g. after changing what they depend on"""
+        env = app.jinja_env
+        with env.fragment_cache_lock:
+            env.fragment_cache.clear()
+
+
+# Shared instance, bound to an app with template_cache.init_app(app)
+template_cache = TemplateCache()
@@ -0,0 +1,166 @@
+import bisect
+
+import pytest
+
+import rate_limit
+from rate_limit import LoginRateLimiter, MemoryBackend, RedisBackend
+
+
+class FakeClock:
+    """Stands in for the time module inside rate_limit"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeRedis:
+    """Local stand-in for the sorted-set commands RedisBackend uses"""
+
+    def __init__(self):
+        self.sets = {}
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def zadd(self, name, mapping):
+        members = self.sets.setdefault(name, [])
+        for member, score in mapping.items():
+            bisect.insort(members, (score, member))
+
+    def zremrangebyscore(self, name, low, high):
+        self.sets[name] = [(s, m) for s, m in self.sets.get(name, []) if not low <= s <= high]
+
+    def zcount(self, name, low, high):
+        high = float('inf') if high == '+inf' else high
+        return sum(1 for s, _ in self.sets.get(name, []) if low <= s <= high)
+
+    def expire(self, name, seconds):
+        pass
+
+    def delete(self, name):
+        self.sets.pop(name, None)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append((name, args))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+class BrokenBackend:
+    def add(self, key, limit, window):
+        raise ConnectionError('backend down')
+
+    count = reset = add
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def limiter(request, clock):
+    backend = MemoryBackend() if request.param == 'memory' else RedisBackend(FakeRedis())
+    return LoginRateLimiter(backend, max_attempts=3, window=60, max_attempts_per_ip=5)
+
+
+def test_limits_after_max_attempts(limiter):
+    for _ in range(2):
+        limiter.record_failure('vault-dweller', '10.0.0.1')
+    assert not limiter.is_limited('vault-dweller', '10.0.0.1')
+    limiter.record_failure('vault-dweller', '10.0.0.1')
+    assert limiter.is_limited('vault-dweller', '10.0.0.1')
+
+
+def test_failures_expire_at_window_boundary(limiter, clock):
+    for _ in range(3):
+        limiter.record_failure('vault-dweller')
+    clock.advance(59.9)
+    assert limiter.is_limited('vault-dweller')
+    clock.advance(0.2)
+    assert not limiter.is_limited('vault-dweller')
+    assert limiter.failure_count('vault-dweller') == 0
+
+
+def test_window_slides_per_failure(limiter, clock):
+    limiter.record_failure('vault-dweller')
+    clock.advance(30)
+    limiter.record_failure('vault-dweller')
+    limiter.record_failure('vault-dweller')
+    assert limiter.is_limited('vault-dweller')
+    clock.advance(30.1)  # only the first failure has left the window
+    assert not limiter.is_limited('vault-dweller')
+    assert limiter.failure_count('vault-dweller') == 2
+
+
+def test_username_limit_is_independent_of_address(limiter):
+    for _ in range(3):
+        limiter.record_failure('vault-dweller', '10.0.0.1')
+    assert limiter.is_limited('vault-dweller', '10.0.0.2')
+    assert not limiter.is_limited('overseer', '10.0.0.2')
+
+
+def test_address_limit_spans_usernames(limiter):
+    for i in range(5):
+        limiter.record_failure(f'user{i}', '10.0.0.1')
+    assert limiter.is_limited('someone-else', '10.0.0.1')
+    assert not limiter.is_limited('someone-else', '10.0.0.2')
+    assert not limiter.is_limited('someone-else')
+
+
+def test_reset_clears_username(limiter):
+    for _ in range(3):
+        limiter.record_failure('vault-dweller')
+    limiter.reset('vault-dweller')
+    assert not limiter.is_limited('vault-dweller')
+
+
+def test_override_cannot_loosen_limit(limiter):
+    for _ in range(3):
+        limiter.record_failure('vault-dweller')
+    assert limiter.is_limited('vault-dweller', max_attempts=10)
+    assert limiter.is_limited('vault-dweller', max_attempts=2)
+
+
+def test_memory_backend_evicts_least_recently_used(clock):
+    backend = MemoryBackend(max_keys=2)
+    backend.add('a', 5, 60)
+    backend.add('b', 5, 60)
+    backend.add('a', 5, 60)  # 'a' is now the most recently used
+    backend.add('c', 5, 60)
+    assert backend.count('a', 5, 60) == 2
+    assert backend.count('b', 5, 60) == 0
+    assert backend.count('c', 5, 60) == 1
+
+
+def test_memory_backend_keeps_only_limit_events(clock):
+    backend = MemoryBackend()
+    for _ in range(10):
+        backend.add('a', 3, 60)
+    assert backend.count('a', 3, 60) == 3
+
+
+def test_backend_errors_fail_open(clock):
+    limiter = LoginRateLimiter(BrokenBackend(), max_attempts=3, window=60)
+    limiter.record_failure('vault-dweller', '10.0.0.1')
+    assert not limiter.is_limited('vault-dweller', '10.0.0.1')
+    assert limiter.failure_count('vault-dweller') == 0
+    limiter.reset('vault-dweller')
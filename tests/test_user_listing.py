@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+
+from user_listing import list_users
+
+db = SQLAlchemy()
+
+
+class DatedUser(db.Model):
+    """Like models.User: created_at is NOT NULL"""
+    __tablename__ = 'dated_users'
+    __table_args__ = (db.Index('ix_dated_users_created_at_id', 'created_at', 'id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    role = db.Column(db.String(20), default='user')
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+class NullableUser(db.Model):
+    """Like main.py's User: created_at may be NULL"""
+    __tablename__ = 'nullable_users'
+    __table_args__ = (db.Index('ix_nullable_users_created_at_id', 'created_at', 'id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    role = db.Column(db.String(20), default='user')
+    created_at = db.Column(db.DateTime)
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+def _add_users(model, count, undated=()):
+    base = datetime(2077, 10, 23)
+    for i in range(count):
+        db.session.add(model(
+            id=i + 1,
+            username=f'dweller{i:03}',
+            email=f'dweller{i:03}@vault.io',
+            created_at=None if i in undated else base + timedelta(minutes=i // 3)
+        ))
+    db.session.commit()
+
+
+def _all_pages(model, per_page):
+    pages, cursor = [], None
+    while True:
+        users, cursor = list_users(model, cursor=cursor, per_page=per_page)
+        pages.append([user.id for user in users])
+        if cursor is None:
+            return pages
+
+
+def _plans(statements):
+    conn = db.session.connection()
+    return [
+        ' '.join(row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', params))
+        for sql, params in statements
+    ]
+
+
+def _capture(app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append((statement, parameters))
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    return statements, lambda: event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_pages_are_newest_first_without_gaps(app):
+    _add_users(DatedUser, 23)
+    pages = _all_pages(DatedUser, 5)
+    ids = [user_id for page in pages for user_id in page]
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    expected = sorted(range(1, 24), key=lambda i: ((i - 1) // 3, i), reverse=True)
+    assert ids == expected
+
+
+def test_undated_users_follow_dated_users_across_pages(app):
+    undated = {0, 4, 8, 12, 16, 20}
+    _add_users(NullableUser, 23, undated)
+    ids = [user_id for page in _all_pages(NullableUser, 5) for user_id in page]
+    assert len(ids) == len(set(ids)) == 23
+    dated_part, tail = ids[:17], ids[17:]
+    assert tail == sorted((i + 1 for i in undated), reverse=True)
+    assert set(dated_part).isdisjoint(tail)
+
+
+def test_page_boundary_inside_undated_tail(app):
+    _add_users(NullableUser, 6, undated={3, 4, 5})
+    assert _all_pages(NullableUser, 2) == [[3, 2], [1, 6], [5, 4]]
+
+
+def test_cursor_page_seeks_on_index(app):
+    _add_users(DatedUser, 50)
+    _, cursor = list_users(DatedUser, per_page=10)
+    statements, stop = _capture(app)
+    try:
+        list_users(DatedUser, cursor=cursor, per_page=10)
+    finally:
+        stop()
+    plans = _plans(statements)
+    assert len(plans) == 1
+    assert 'SEARCH' in plans[0] and 'ix_dated_users_created_at_id' in plans[0]
+
+
+def test_nullable_cursor_pages_seek_on_index(app):
+    _add_users(NullableUser, 50, undated={1, 2, 3})
+    _, cursor = list_users(NullableUser, per_page=10)
+    statements, stop = _capture(app)
+    try:
+        list_users(NullableUser, cursor=cursor, per_page=10)
+    finally:
+        stop()
+    for plan in _plans(statements):
+        assert 'SEARCH' in plan and 'ix_nullable_users_created_at_id' in plan
@@ -0,0 +1,168 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+
+
+class UserSnapshot:
+    """Detached, read-only view of a user for Flask-Login's current_user.
+
+    Holds only the columns pages read and implements the Flask-Login user
+    interface. It is not an ORM instance, so it can live across requests
+    and threads. Load the model with User.query.get(current_user.id) to
+    change anything.
+    """
+
+    __slots__ = ('id', 'username', 'email', 'role', 'created_at', 'last_login', 'is_active_user')
+
+    def __init__(self, id, username, email, role, created_at=None, last_login=None, is_active_user=True):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+        self.created_at = created_at
+        self.last_login = last_login
+        self.is_active_user = is_active_user
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            role=user.role,
+            created_at=user.created_at,
+            last_login=user.last_login,
+            is_active_user=getattr(user, 'is_active_user', True)
+        )
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @property
+    def is_active(self):
+        return bool(self.is_active_user)
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def get_id(self):
+        return str(self.id)
+
+    def __eq__(self, other):
+        if isinstance(other, UserSnapshot):
+            return self.get_id() == other.get_id()
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+
+class UserCache:
+    """Per-process TTL cache of user snapshots for the Flask-Login user_loader.
+
+    A committed change to a cached user (role, password, deactivation,
+    anything) evicts it through session events. Other worker processes
+    keep their copy until `ttl` seconds pass, so the TTL bounds how long
+    a revoked role can outlive the change there. Bulk query.update()
+    calls bypass the events; call invalidate() after them.
+    """
+
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.user_model = None
+        self.snapshot_type = UserSnapshot
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped on every eviction
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app, db, user_model, snapshot_type=UserSnapshot):
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('USER_CACHE_SIZE', self.max_entries)
+        self.user_model = user_model
+        self.snapshot_type = snapshot_type
+        event.listen(db.session, 'after_flush', self._collect_changes)
+        event.listen(db.session, 'after_commit', self._apply_changes)
+        event.listen(db.session, 'after_soft_rollback', self._discard_changes)
+        app.extensions['user_cache'] = self
+
+    def load(self, user_id):
+        """Snapshot for user_id, from the cache or one primary-key query"""
+        user_id = int(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        user = self.user_model.query.get(user_id)
+        if user is None:
+            return None
+        snapshot = self.snapshot_type.from_user(user)
+        if self.max_entries > 0:
+            with self._lock:
+                if generation != self._generation:
+                    return snapshot  # Evicted while we were loading; don't cache what may be stale
+                self._entries[user_id] = (now + self.ttl, snapshot)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id=None):
+        """Drop one user's snapshot, or every snapshot if user_id is None"""
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def _collect_changes(self, session, flush_context):
+        changed = session.info.setdefault('user_cache_pending', set())
+        for obj in list(session.dirty) + list(session.deleted):
+            if isinstance(obj, self.user_model) and obj.id is not None:
+                changed.add(obj.id)
+
+    def _apply_changes(self, session):
+        # Evict after commit so a concurrent load can't cache the old row
+        changed = session.info.pop('user_cache_pending', None)
+        if changed:
+            with self._lock:
+                self._generation += 1
+                for user_id in changed:
+                    self._entries.pop(user_id, None)
+
+    def _discard_changes(self, session, previous_transaction):
+        session.info.pop('user_cache_pending', None)
+
+
+# Shared instance, bound with user_cache.init_app(app, db, User)
+user_cache = UserCache()
@@ -0,0 +1,79 @@
+from datetime import datetime
+
+from sqlalchemy import and_, or_
+
+from db_routing import reporting
+
+# Upper bound for prefix ranges; sorts after any character a username or email can hold
+_PREFIX_END = '\U0010ffff'
+
+
+def encode_cursor(user):
+    """Opaque keyset cursor for the position after `user`; a NULL created_at is left empty"""
+    created_at = user.created_at.isoformat() if user.created_at is not None else ''
+    return f'{created_at}_{user.id}'
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor, or None if it is missing or malformed"""
+    if not cursor or '_' not in cursor:
+        return None
+    try:
+        created_at, _, user_id = cursor.rpartition('_')
+        return (datetime.fromisoformat(created_at) if created_at else None), int(user_id)
+    except ValueError:
+        return None
+
+
+def list_users(User, cursor=None, search=None, role=None, per_page=50):
+    """One page of users, newest first, using keyset pagination on (created_at, id).
+
+    `search` is a case-sensitive username or email prefix. It is matched
+    as a range so the unique indexes on both columns can be used. Returns
+    (users, next_cursor), and next_cursor is None on the last page. Reads
+    from the reporting replica when one is configured.
+
+    Where created_at is nullable (main.py's model), users without one
+    come after every dated user, ordered by id. The dated range and that
+    tail are read by separate seeks, so each stays on the
+    (created_at, id) index.
+    """
+    query = User.query
+
+    if role:
+        query = query.filter(User.role == role)
+
+    if search:
+        query = query.filter(or_(
+            and_(User.username >= search, User.username < search + _PREFIX_END),
+            and_(User.email >= search, User.email < search + _PREFIX_END)
+        ))
+
+    nullable = User.__table__.c.created_at.nullable
+    position = decode_cursor(cursor)
+    in_tail = position is not None and position[0] is None
+
+    # One extra row tells us whether there is a next page
+    users = []
+    with reporting():
+        if not in_tail:
+            dated = query
+            if position is not None:
+                created_at, user_id = position
+                # The redundant upper bound lets SQLite seek the index instead of scanning it
+                dated = dated.filter(User.created_at <= created_at, or_(
+                    User.created_at < created_at,
+                    and_(User.created_at == created_at, User.id < user_id)
+                ))
+            elif nullable:
+                dated = dated.filter(User.created_at.isnot(None))
+            users = dated.order_by(User.created_at.desc(), User.id.desc()).limit(per_page + 1).all()
+
+        if nullable and len(users) <= per_page:
+            undated = query.filter(User.created_at.is_(None))
+            if in_tail:
+                undated = undated.filter(User.id < position[1])
+            users += undated.order_by(User.id.desc()).limit(per_page + 1 - len(users)).all()
+
+    next_cursor = encode_cursor(users[per_page - 1]) if len(users) > per_page else None
+    return users[:per_page], next_cursor
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import event, inspect
+
+# Detached view of a recently created user for dashboards
+RecentUser = namedtuple('RecentUser', 'id username email role created_at')
+
+
+class UserStatistics:
+    """In-memory user count, admin count and newest users.
+
+    Committed inserts, role changes and deletes of the user model update
+    the figures through session events, so dashboards read them without
+    SQL. Every `reconcile_interval` seconds the next reader reloads them
+    from the primary database, which also picks up changes made by other
+    worker processes. The reporting replica is not used for this: its
+    lag would undo increments this process has already applied, and the
+    dashboard count would go backwards.
+    """
+
+    def __init__(self, reconcile_interval=300, recent_limit=5):
+        self.reconcile_interval = reconcile_interval
+        self.recent_limit = recent_limit
+        self.user_model = None
+        self._user_count = 0
+        self._admin_count = 0
+        self._recent = []
+        self._loaded_at = None
+        self._generation = 0  # bumped by every applied commit
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def init_app(self, app, db, user_model):
+        self.reconcile_interval = app.config.get('USER_STATS_RECONCILE_INTERVAL', self.reconcile_interval)
+        self.user_model = user_model
+        event.listen(db.session, 'after_flush', self._collect_changes)
+        event.listen(db.session, 'after_commit', self._apply_changes)
+        event.listen(db.session, 'after_soft_rollback', self._discard_changes)
+        app.extensions['user_stats'] = self
+
+    def snapshot(self):
+        """(user_count, admin_count, recent_users), reloading if stale"""
+        self._reconcile_if_stale()
+        with self._lock:
+            return self._user_count, self._admin_count, list(self._recent)
+
+    def user_count(self):
+        return self.snapshot()[0]
+
+    def admin_count(self):
+        return self.snapshot()[1]
+
+    def invalidate(self):
+        """Force a reload on the next read"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _is_stale(self):
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at >= self.reconcile_interval
+
+    def _reconcile_if_stale(self):
+        if not self._is_stale():
+            return
+        # One reader reloads; the others keep serving the current figures,
+        # and only wait when nothing has been loaded yet
+        if not self._reload_lock.acquire(blocking=self._loaded_at is None):
+            return
+        try:
+            if self._is_stale():
+                self.reconcile()
+        finally:
+            self._reload_lock.release()
+
+    def reconcile(self):
+        """Reload every figure from the database.
+
+        The queries run without the lock, so dashboards and commits are
+        not held up by them; the lock is only taken to swap the results in.
+        """
+        User = self.user_model
+        generation = self._generation
+        user_count = User.query.count()
+        admin_count = User.query.filter_by(role='admin').count()
+        recent = [
+            _snapshot(user)
+            for user in User.query.order_by(User.created_at.desc()).limit(self.recent_limit)
+        ]
+        with self._lock:
+            self._user_count = user_count
+            self._admin_count = admin_count
+            self._recent = recent
+            now = time.monotonic()
+            if self._generation != generation:
+                # A commit landed while the queries ran and may be missing
+                # from their results; the next reader reloads again
+                now -= self.reconcile_interval
+            self._loaded_at = now
+
+    def _collect_changes(self, session, flush_context):
+        # Attribute history is still available in after_flush
+        pending = session.info.setdefault('user_stats_pending', [])
+        for obj in session.new:
+            if isinstance(obj, self.user_model):
+                pending.append(('created', None, obj.role, _snapshot(obj)))
+        for obj in session.dirty:
+            if isinstance(obj, self.user_model):
+                history = inspect(obj).attrs.role.history
+                if history.has_changes() and history.deleted:
+                    pending.append(('role', history.deleted[0], obj.role, _snapshot(obj)))
+        for obj in session.deleted:
+            if isinstance(obj, self.user_model):
+                pending.append(('deleted', obj.role, None, _snapshot(obj)))
+
+    def _apply_changes(self, session):
+        pending = session.info.pop('user_stats_pending', None)
+        if not pending:
+            return
+        with self._lock:
+            self._generation += 1
+            if self._loaded_at is None:
+                return  # Nothing loaded yet; the first read queries the database
+            for change, old_role, new_role, user in pending:
+                if change == 'created':
+                    self._user_count += 1
+                    self._add_recent(user)
+                elif change == 'deleted':
+                    self._user_count -= 1
+                    self._recent = [recent for recent in self._recent if recent.id != user.id]
+                else:
+                    self._recent = [user if recent.id == user.id else recent for recent in self._recent]
+                self._admin_count += (new_role == 'admin') - (old_role == 'admin')
+
+    def _discard_changes(self, session, previous_transaction):
+        session.info.pop('user_stats_pending', None)
+
+    def _add_recent(self, user):
+        recent = self._recent + [user]
+        recent.sort(key=lambda item: item.created_at, reverse=True)
+        self._recent = recent[:self.recent_limit]
+
+
+def _snapshot(user):
+    return RecentUser(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        role=user.role,
+        created_at=user.created_at or datetime.utcnow()
+    )
+
+
+# Shared instance, bound with user_stats.init_app(app, db, User)
+user_stats = UserStatistics()